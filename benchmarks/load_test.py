@@ -0,0 +1,101 @@
+"""
+Load test comparing throughput of the WSGI and ASGI deployments.
+
+Serve the project both ways on the same database, e.g.
+
+    gunicorn social_media_core.wsgi -w 4 -b :8000
+    uvicorn social_media_core.asgi:application --workers 4 --port 8001
+
+and point the benchmark at the sync and async routes with a bearer token
+from /users/login/:
+
+    python benchmarks/load_test.py --token <ACCESS> \\
+        http://localhost:8000/api/posts/ \\
+        http://localhost:8001/api/async/posts/ \\
+        http://localhost:8001/api/posts/
+
+Every URL gets ``--requests`` GETs from ``--concurrency`` parallel clients.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiohttp
+
+
+async def worker(session, url, queue, latencies, errors):
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        try:
+            async with session.get(url) as response:
+                await response.read()
+                if response.status != 200:
+                    errors[response.status] = errors.get(response.status, 0) + 1
+                    continue
+        except aiohttp.ClientError as error:
+            errors[type(error).__name__] = errors.get(type(error).__name__, 0) + 1
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(url, token, requests, concurrency):
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+    latencies, errors = [], {}
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(
+        headers=headers, connector=connector
+    ) as session:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *[
+                worker(session, url, queue, latencies, errors)
+                for _ in range(concurrency)
+            ]
+        )
+        elapsed = time.perf_counter() - started
+
+    return latencies, errors, elapsed
+
+
+def report(url, latencies, errors, elapsed):
+    print(url)
+    print(f"  {len(latencies) / elapsed:10.1f} req/s, {elapsed:.2f} s total")
+    if latencies:
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"  latency p50 {quantiles[49] * 1000:.1f} ms, "
+            f"p95 {quantiles[94] * 1000:.1f} ms, "
+            f"p99 {quantiles[98] * 1000:.1f} ms"
+        )
+    if errors:
+        print(f"  errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--token", help="JWT access token")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    options = parser.parse_args()
+
+    for url in options.urls:
+        report(
+            url,
+            *asyncio.run(
+                run(url, options.token, options.requests, options.concurrency)
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Microbenchmark of list serialization: the ModelSerializer classes used
+for writes against the read-only fast paths of the list endpoints.
+
+    DJANGO_SECRET_KEY=... python benchmarks/serializer_throughput.py
+
+Rows are built in memory, so only serialization is measured.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "social_media_core.settings")
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+
+from social_media.models import Post, PostImage  # noqa: E402
+from social_media.serializers import (  # noqa: E402
+    PostFeedSerializer,
+    PostListSerializer,
+)
+from user.serializers import (  # noqa: E402
+    ProfileListSerializer,
+    ProfileReadSerializer,
+)
+
+
+def make_rows(count):
+    User = get_user_model()
+    users = [
+        User(
+            id=index,
+            email=f"user{index}@example.com",
+            first_name="First",
+            last_name="Last",
+            bio="Bio",
+            image=f"uploads/users/{index}.png",
+            image_renditions={"thumbnail": f"uploads/users/{index}-t.webp"},
+        )
+        for index in range(1, count + 1)
+    ]
+    posts = []
+    for user in users:
+        post = Post(
+            id=user.id,
+            owner=user,
+            message="Serialized #benchmark #post",
+            parsed_hashtags=["benchmark", "post"],
+        )
+        post.gallery = [
+            PostImage(
+                image=f"uploads/posts/{user.id}-{position}.png",
+                image_renditions={
+                    "feed": f"uploads/posts/{user.id}-{position}-f.webp"
+                },
+            )
+            for position in range(2)
+        ]
+        posts.append(post)
+    return posts, users
+
+
+def rows_per_second(serializer_class, rows, context, repeat):
+    best = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        serializer_class(rows, many=True, context=context).data
+        best = max(best, len(rows) / (time.perf_counter() - started))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    options = parser.parse_args()
+
+    posts, users = make_rows(options.rows)
+    with override_settings(ALLOWED_HOSTS=["testserver"]):
+        context = {"request": RequestFactory().get("/")}
+        for name, rows, slow, fast in (
+            ("posts", posts, PostListSerializer, PostFeedSerializer),
+            ("profiles", users, ProfileListSerializer, ProfileReadSerializer),
+        ):
+            assert (
+                slow(rows[:1], many=True, context=context).data
+                == fast(rows[:1], many=True, context=context).data
+            )
+            slow_rate = rows_per_second(slow, rows, context, options.repeat)
+            fast_rate = rows_per_second(fast, rows, context, options.repeat)
+            print(
+                f"{name:9} {slow.__name__:22} {slow_rate:10.0f} rows/s\n"
+                f"{'':9} {fast.__name__:22} {fast_rate:10.0f} rows/s "
+                f"({fast_rate / slow_rate:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Coroutine versions of the read-heavy post endpoints for ASGI servers.
+Rows are read as ``values()`` projections with the async ORM, so no
+request is handed over to the single thread of ``sync_to_async``.
+"""
+import asyncio
+import base64
+import json
+from collections import defaultdict
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import NotFound, ValidationError
+
+from social_media.images import stored_rendition_url
+from social_media.links import url_builder
+from social_media.models import Post, PostImage
+from social_media.pagination import PostCursorPagination
+from social_media.realtime import author_channel, get_broker
+from social_media.timeline import feed_for
+from social_media.views import filter_by_hashtags
+from user.authentication import async_api_view
+
+POST_FIELDS = ("id", "message", "parsed_hashtags", "created_at", "owner__email")
+
+
+def encode_cursor(post: dict) -> str:
+    position = f"{post['created_at'].isoformat()}|{post['id']}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Q:
+    """
+    Keyset filter for posts following the ``(created_at, id)`` cursor.
+    """
+    try:
+        created_at, post_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        created_at, post_id = datetime.fromisoformat(created_at), int(post_id)
+    except ValueError:
+        raise NotFound("Invalid cursor")
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=post_id)
+
+
+def page_size(request) -> int:
+    pagination = PostCursorPagination
+    try:
+        size = int(
+            request.GET.get(pagination.page_size_query_param, pagination.page_size)
+        )
+    except ValueError:
+        raise ValidationError({"page_size": "A valid integer is required."})
+    return max(1, min(size, pagination.max_page_size))
+
+
+async def post_galleries(request, post_ids, rendition: str) -> dict:
+    """
+    Absolute URLs of ordered images of every post, in one query.
+    """
+    storage = PostImage._meta.get_field("image").storage
+    urls = url_builder(request)
+    galleries = defaultdict(list)
+    images = (
+        PostImage.objects.filter(post_id__in=post_ids)
+        .order_by("position")
+        .values_list("post_id", "image", "image_renditions")
+    )
+    async for post_id, image, renditions in images:
+        url = stored_rendition_url(storage, image, renditions, rendition)
+        if url:
+            galleries[post_id].append(urls.absolute(url))
+    return galleries
+
+
+@async_api_view("GET")
+async def post_list(request):
+    """
+    Home feed of the user, paginated by the ``cursor`` of the ``next`` link.
+    """
+    size = page_size(request)
+    cursor = request.GET.get("cursor")
+    bound = decode_cursor(cursor) if cursor else None
+    queryset = feed_for(
+        request.user,
+        filter_by_hashtags(Post.objects.all(), request.GET.get("hashtags")),
+        bound=bound,
+        limit=size + 1,
+    )
+    if bound is not None:
+        queryset = queryset.filter(bound)
+
+    posts = [
+        post
+        async for post in queryset.order_by("-created_at", "-id")
+        .values(*POST_FIELDS)[:size + 1]
+    ]
+    next_url = None
+    if len(posts) > size:
+        posts = posts[:size]
+        query = request.GET.copy()
+        query["cursor"] = encode_cursor(posts[-1])
+        next_url = request.build_absolute_uri(f"?{query.urlencode()}")
+
+    galleries = await post_galleries(
+        request, [post["id"] for post in posts], "feed"
+    )
+    urls = url_builder(request)
+    results = [
+        {
+            "owner_email": post["owner__email"],
+            "hashtags": post["parsed_hashtags"],
+            "message_short": post["message"][:15],
+            "message_link": urls.reverse("api:post-detail", post["id"]),
+            "image": next(iter(galleries[post["id"]]), None),
+            "images": galleries[post["id"]],
+        }
+        for post in posts
+    ]
+    return JsonResponse({"next": next_url, "results": results})
+
+
+@async_api_view("GET")
+async def post_detail(request, pk):
+    try:
+        post = await Post.objects.values(*POST_FIELDS).aget(pk=pk)
+    except Post.DoesNotExist:
+        raise NotFound()
+
+    gallery = (await post_galleries(request, [pk], "full"))[pk]
+    return JsonResponse(
+        {
+            "hashtags": post["parsed_hashtags"],
+            "message": post["message"],
+            "owner_email": post["owner__email"],
+            "image": next(iter(gallery), None),
+            "images": gallery,
+        }
+    )
+
+
+async def post_events(subscription):
+    """
+    Event stream of the subscription. It ends after REALTIME_STREAM_SECONDS,
+    EventSource clients reconnect by themselves, so subscriptions of
+    disconnected clients that the server did not notice are released too.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.REALTIME_STREAM_SECONDS
+    try:
+        yield "retry: 1000\n\n"
+        while loop.time() < deadline:
+            message = await subscription.get(
+                timeout=min(
+                    settings.REALTIME_HEARTBEAT_SECONDS,
+                    deadline - loop.time(),
+                )
+            )
+            if message is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: post\ndata: {json.dumps(message)}\n\n"
+    finally:
+        await subscription.close()
+
+
+@async_api_view("GET")
+async def post_stream(request):
+    """
+    Server-Sent Events stream announcing ids of new posts of the user
+    and of the authors followed when the stream was opened.
+    """
+    author_ids = [request.user.id] + [
+        author_id
+        async for author_id in request.user.following.values_list(
+            "id", flat=True
+        )
+    ]
+    subscription = await get_broker().subscribe(
+        [author_channel(author_id) for author_id in author_ids]
+    )
+    response = StreamingHttpResponse(
+        post_events(subscription), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
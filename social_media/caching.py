@@ -0,0 +1,90 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def response_cache_key(prefix: str, pk) -> str:
+    return f"response:{prefix}:{pk}"
+
+
+def invalidate_responses(prefix: str, pks) -> None:
+    cache.delete_many([response_cache_key(prefix, pk) for pk in pks])
+
+
+def etag_for(data) -> str:
+    payload = json.dumps(data, sort_keys=True, default=str).encode()
+    return f'"{hashlib.md5(payload).hexdigest()}"'
+
+
+class CachedRetrieveMixin:
+    """
+    Serves GET of a single object from the cache of its serialized data
+    and answers ``If-None-Match`` with 304. Entries are kept per site
+    root because serialized data contains absolute URLs, and are
+    invalidated by ``invalidate_responses(cache_prefix, [pk])``.
+    """
+    cache_prefix = None
+
+    def get_cache_pk(self):
+        return self.kwargs["pk"]
+
+    def retrieve(self, request, *args, **kwargs):
+        key = response_cache_key(self.cache_prefix, self.get_cache_pk())
+        root = request.build_absolute_uri("/")
+        entries = cache.get(key) or {}
+
+        if root not in entries:
+            response = super().retrieve(request, *args, **kwargs)
+            entries[root] = (etag_for(response.data), dict(response.data))
+            cache.set(key, entries, settings.RESPONSE_CACHE_TTL)
+
+        etag, data = entries[root]
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+        return Response(data, headers={"ETag": etag})
+
+
+class ConditionalListMixin:
+    """
+    Fingerprints the filtered list queryset with its row count and the
+    latest of ``version_fields`` timestamps in one aggregate query.
+    The fingerprint is sent as ETag and a matching ``If-None-Match``
+    gets 304 before any row is loaded or serialized.
+    """
+    version_fields = ("updated_at",)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        stats = queryset.order_by().aggregate(
+            total=Count("pk"),
+            **{
+                f"last_{index}": Max(field)
+                for index, field in enumerate(self.version_fields)
+            },
+        )
+        etag = etag_for([request.get_full_path(), request.user.pk, stats])
+        last_modified = max(
+            (value for key, value in stats.items() if key != "total" and value),
+            default=None,
+        )
+        headers = {"ETag": etag}
+        if last_modified:
+            headers["Last-Modified"] = http_date(last_modified.timestamp())
+
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+
+        response = super().list(request, *args, **kwargs)
+        for header, value in headers.items():
+            response[header] = value
+        return response
@@ -0,0 +1,201 @@
+import io
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from social_media.models import ImageJob
+from social_media.storage import release_names
+
+
+def render_renditions(
+    data: bytes, sizes: dict[str, int], image_format: str
+) -> dict[str, bytes]:
+    """
+    Resizes the image to every size of ``sizes`` keeping its aspect ratio.
+    Orientation from EXIF is applied, the metadata itself is dropped.
+    Pure function, so it can run in a process pool.
+    """
+    renditions = {}
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        mode = "RGB" if image_format == "JPEG" else "RGBA"
+        if image.mode != mode:
+            image = image.convert(mode)
+
+        for name, size in sizes.items():
+            rendition = image.copy()
+            rendition.thumbnail((size, size))
+            buffer = io.BytesIO()
+            rendition.save(buffer, format=image_format, quality=80)
+            renditions[name] = buffer.getvalue()
+
+    return renditions
+
+
+def clear_renditions(instance, field_name: str = "image") -> None:
+    """
+    Releases renditions of ``instance.<field_name>`` and forgets them.
+    """
+    renditions = getattr(instance, f"{field_name}_renditions")
+    if not renditions:
+        return
+
+    storage = instance._meta.get_field(field_name).storage
+    release_names(storage, renditions.values())
+    setattr(instance, f"{field_name}_renditions", {})
+    type(instance).objects.filter(pk=instance.pk).update(
+        **{f"{field_name}_renditions": {}}
+    )
+
+
+def enqueue_image_job(instance, field_name: str = "image") -> None:
+    """
+    Queues rendition processing of ``instance.<field_name>``
+    and releases renditions of the previous file.
+    """
+    file = getattr(instance, field_name)
+    if not file:
+        return
+
+    clear_renditions(instance, field_name)
+    ImageJob.objects.create(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+        field_name=field_name,
+        source_name=file.name,
+    )
+
+
+def enqueue_image_jobs(instances, field_name: str = "image") -> None:
+    """
+    Queues rendition processing of freshly created instances in one INSERT.
+    """
+    ImageJob.objects.bulk_create(
+        [
+            ImageJob(
+                content_type=ContentType.objects.get_for_model(instance),
+                object_id=instance.pk,
+                field_name=field_name,
+                source_name=getattr(instance, field_name).name,
+            )
+            for instance in instances
+            if getattr(instance, field_name)
+        ]
+    )
+
+
+def claim_image_jobs(batch_size: int) -> list[ImageJob]:
+    """
+    Marks a batch of pending jobs as processing and returns it,
+    concurrent workers skip rows locked by each other. Jobs processing
+    for longer than IMAGE_JOB_LEASE_SECONDS were left by a worker that
+    died and are claimed again. Every claim counts as an attempt.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=settings.IMAGE_JOB_LEASE_SECONDS)
+    stale = Q(status=ImageJob.Status.PROCESSING, claimed_at__lt=now - lease)
+    with transaction.atomic():
+        ImageJob.objects.filter(
+            stale, attempts__gte=settings.IMAGE_JOB_MAX_ATTEMPTS
+        ).update(
+            status=ImageJob.Status.FAILED,
+            error="The worker processing the job did not finish it.",
+        )
+        jobs = list(
+            ImageJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=ImageJob.Status.PENDING) | stale)
+            .order_by("id")[:batch_size]
+        )
+        ImageJob.objects.filter(id__in=[job.id for job in jobs]).update(
+            status=ImageJob.Status.PROCESSING,
+            claimed_at=now,
+            attempts=F("attempts") + 1,
+        )
+    for job in jobs:
+        job.status = ImageJob.Status.PROCESSING
+        job.claimed_at = now
+        job.attempts += 1
+    return jobs
+
+
+def read_job_source(job: ImageJob) -> bytes | None:
+    """
+    Returns bytes of the image the job was queued for,
+    None if the object is gone or its image was replaced since.
+    """
+    instance = job.content_object
+    file = getattr(instance, job.field_name, None) if instance else None
+    if not file or file.name != job.source_name:
+        return None
+
+    with file.open("rb"):
+        return file.read()
+
+
+def store_renditions(job: ImageJob, renditions: dict[str, bytes]) -> None:
+    """
+    Saves renditions onto the object, unless its image was replaced
+    while they were rendered. Their files are released then.
+    """
+    model = job.content_type.model_class()
+    storage = model._meta.get_field(job.field_name).storage
+    stem, _ = os.path.splitext(os.path.basename(job.source_name))
+    extension = settings.IMAGE_RENDITION_FORMAT.lower()
+
+    names = {
+        name: storage.save(
+            f"uploads/renditions/{stem}-{name}.{extension}",
+            ContentFile(content),
+        )
+        for name, content in renditions.items()
+    }
+    field_name = f"{job.field_name}_renditions"
+    with transaction.atomic():
+        instance = (
+            model.objects.select_for_update().filter(pk=job.object_id).first()
+        )
+        file = getattr(instance, job.field_name, None) if instance else None
+        if not file or file.name != job.source_name:
+            release_names(storage, names.values())
+            return
+        setattr(instance, field_name, names)
+        instance.save(update_fields=[field_name])
+
+
+def finish_image_job(job: ImageJob, error: str = "") -> None:
+    if not error:
+        job.status = ImageJob.Status.DONE
+    elif job.attempts >= settings.IMAGE_JOB_MAX_ATTEMPTS:
+        job.status = ImageJob.Status.FAILED
+    else:
+        job.status = ImageJob.Status.PENDING
+    job.error = error
+    job.save(update_fields=["status", "error"])
+
+
+def rendition_url(file, renditions: dict, name: str) -> str | None:
+    """
+    Storage URL of the rendition, or of the original file
+    while renditions are not processed yet.
+    """
+    if not file:
+        return None
+    return stored_rendition_url(file.storage, file.name, renditions, name)
+
+
+def stored_rendition_url(
+    storage, file_name: str, renditions: dict, name: str
+) -> str | None:
+    """
+    rendition_url for a file name and renditions read with ``values()``.
+    """
+    if not file_name:
+        return None
+    return storage.url(renditions.get(name) or file_name)
@@ -0,0 +1,43 @@
+from django.urls import reverse
+
+# Stands for the object id while a route is reversed into a template.
+ID_MARKER = 918273645
+
+
+class URLBuilder:
+    """
+    Builds absolute URLs for one request: the scheme and host prefix is
+    resolved once, every route is reversed once into a template and ids
+    are formatted into it afterwards.
+    """
+
+    def __init__(self, request):
+        self.root = request.build_absolute_uri("/")[:-1]
+        self.request = request
+        self.templates = {}
+
+    def absolute(self, url: str | None) -> str | None:
+        if not url:
+            return None
+        if url.startswith("/") and not url.startswith("//"):
+            return self.root + url
+        return self.request.build_absolute_uri(url)
+
+    def reverse(self, viewname: str, pk) -> str:
+        template = self.templates.get(viewname)
+        if template is None:
+            path = reverse(viewname, args=[ID_MARKER])
+            template = self.templates[viewname] = (
+                self.root + path.replace(str(ID_MARKER), "{}", 1)
+            )
+        return template.format(pk)
+
+
+def url_builder(request) -> URLBuilder:
+    """
+    URLBuilder of the request, created on first use.
+    """
+    builder = getattr(request, "_url_builder", None)
+    if builder is None:
+        builder = request._url_builder = URLBuilder(request)
+    return builder
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from social_media.models import Post, index_post_hashtags, parse_hashtags
+
+
+class Command(BaseCommand):
+    help = (
+        "Parses hashtags of existing posts again into the stored column "
+        "and the hashtag index, e.g. after the pattern changed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of posts updated per transaction",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        posts = Post.objects.only("id", "message").order_by("id")
+        batch = []
+        extracted = 0
+
+        for post in posts.iterator(chunk_size=batch_size):
+            post.parsed_hashtags = parse_hashtags(post.message)
+            batch.append(post)
+            if len(batch) == batch_size:
+                extracted += self.store(batch)
+                batch = []
+        extracted += self.store(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Extracted hashtags of {extracted} posts")
+        )
+
+    def store(self, batch) -> int:
+        with transaction.atomic():
+            Post.objects.bulk_update(batch, ["parsed_hashtags"])
+            index_post_hashtags(batch)
+        return len(batch)
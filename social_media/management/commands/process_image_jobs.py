@@ -0,0 +1,83 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from social_media.images import (
+    claim_image_jobs,
+    finish_image_job,
+    read_job_source,
+    render_renditions,
+    store_renditions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker making resized renditions of uploaded images, "
+        "images are decoded and encoded in a process pool"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=2,
+            help="Size of the process pool",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="Number of jobs claimed at once",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the queue is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when the queue is empty",
+        )
+
+    def handle(self, *args, **options):
+        with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+            while True:
+                jobs = claim_image_jobs(options["batch_size"])
+                if not jobs:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+                self.process_batch(pool, jobs)
+
+    def process_batch(self, pool, jobs):
+        futures = {}
+        for job in jobs:
+            try:
+                data = read_job_source(job)
+            except OSError as error:
+                finish_image_job(job, error=str(error))
+                continue
+            if data is None:
+                finish_image_job(job)
+                continue
+            futures[job] = pool.submit(
+                render_renditions,
+                data,
+                settings.IMAGE_RENDITIONS,
+                settings.IMAGE_RENDITION_FORMAT,
+            )
+
+        for job, future in futures.items():
+            try:
+                store_renditions(job, future.result())
+            except Exception as error:
+                finish_image_job(job, error=repr(error))
+            else:
+                finish_image_job(job)
+                self.stdout.write(f"Processed image job {job.id}")
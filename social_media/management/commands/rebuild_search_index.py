@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from social_media.models import Post
+from social_media.search import (
+    POST,
+    PROFILE,
+    index_documents,
+    post_document,
+    profile_document,
+)
+
+
+class Command(BaseCommand):
+    help = "Reindexes posts and profiles for full-text search in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows indexed per transaction",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        sources = [
+            (POST, Post.objects.only("id", "message"), post_document),
+            (
+                PROFILE,
+                get_user_model().objects.only(
+                    "id", "email", "first_name", "last_name", "bio"
+                ),
+                profile_document,
+            ),
+        ]
+
+        for kind, queryset, document in sources:
+            queryset = queryset.order_by("id")
+            last_id = 0
+            indexed = 0
+            while True:
+                batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                with transaction.atomic():
+                    index_documents(
+                        kind, {item.id: document(item) for item in batch}
+                    )
+                last_id = batch[-1].id
+                indexed += len(batch)
+
+            self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} {kind}s"))
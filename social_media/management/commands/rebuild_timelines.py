@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from social_media.timeline import backfill_authors
+
+
+class Command(BaseCommand):
+    help = "Fills materialized home timelines from the current follow graph"
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by("id")
+        rebuilt = 0
+
+        for user in users.iterator():
+            backfill_authors(user, [user])
+            for author in user.following.all():
+                backfill_authors(user, [author])
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} timelines"))
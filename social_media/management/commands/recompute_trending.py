@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from social_media.trending import recompute_trending
+
+
+class Command(BaseCommand):
+    help = "Ranks trending hashtags from the bucketed use counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.TRENDING_BUCKET_SECONDS,
+            help="Seconds between recomputations",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Recompute once and exit, e.g. from cron",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            trending = recompute_trending()
+            self.stdout.write(f"Ranked {len(trending)} trending hashtags")
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
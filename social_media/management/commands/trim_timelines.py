@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from social_media.timeline import trim_timelines
+
+
+class Command(BaseCommand):
+    help = "Deletes timeline entries beyond TIMELINE_MAX_ENTRIES per user"
+
+    def handle(self, *args, **options):
+        deleted = trim_timelines()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} timeline entries")
+        )
@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-18 07:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0003_timelineentry"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="post",
+            options={"ordering": ["-created_at", "-id"]},
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["owner", "created_at", "id"], name="post_owner_created_idx"
+            ),
+        ),
+    ]
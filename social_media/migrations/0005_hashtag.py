@@ -0,0 +1,79 @@
+# Generated by Django 4.2 on 2026-10-18 07:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0004_post_created_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Hashtag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PostHashtag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "hashtag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="post_hashtags",
+                        to="social_media.hashtag",
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="post_hashtags",
+                        to="social_media.post",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="tags",
+            field=models.ManyToManyField(
+                related_name="posts",
+                through="social_media.PostHashtag",
+                to="social_media.hashtag",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="posthashtag",
+            index=models.Index(
+                fields=["hashtag", "post"], name="post_hashtag_lookup_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="posthashtag",
+            constraint=models.UniqueConstraint(
+                fields=("post", "hashtag"), name="unique_post_hashtag"
+            ),
+        ),
+    ]
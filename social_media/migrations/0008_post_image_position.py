@@ -0,0 +1,48 @@
+# Generated by Django 4.2 on 2026-10-18 07:16
+
+from django.db import migrations, models
+
+
+def number_post_images(apps, schema_editor):
+    PostImage = apps.get_model("social_media", "PostImage")
+    images = PostImage.objects.order_by("post_id", "id").only("id", "post_id")
+    updated = []
+    post_id, position = None, 0
+
+    for image in images.iterator():
+        position = position + 1 if image.post_id == post_id else 0
+        post_id = image.post_id
+        if position:
+            image.position = position
+            updated.append(image)
+
+    PostImage.objects.bulk_update(updated, ["position"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0007_mediablob"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="postimage",
+            options={"ordering": ["position"]},
+        ),
+        migrations.RemoveField(
+            model_name="postimage",
+            name="title",
+        ),
+        migrations.AddField(
+            model_name="postimage",
+            name="position",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(number_post_images, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="postimage",
+            constraint=models.UniqueConstraint(
+                fields=("post", "position"), name="unique_post_image_position"
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+from social_media.search import (
+    POST,
+    PROFILE,
+    get_backend,
+    index_documents,
+    post_document,
+    profile_document,
+)
+
+
+def create_search_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        get_backend(schema_editor.connection).create_table(cursor)
+
+    Post = apps.get_model("social_media", "Post")
+    User = apps.get_model("user", "User")
+    index_documents(
+        POST, {post.id: post_document(post) for post in Post.objects.all()}
+    )
+    index_documents(
+        PROFILE,
+        {user.id: profile_document(user) for user in User.objects.all()},
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        get_backend(schema_editor.connection).drop_table(cursor)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0009_post_updated_at"),
+        ("user", "0007_user_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2 on 2026-10-18 07:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0010_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrendingHashtag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("count", models.PositiveIntegerField()),
+                ("computed_at", models.DateTimeField()),
+                (
+                    "hashtag",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="trending",
+                        to="social_media.hashtag",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["rank"],
+            },
+        ),
+        migrations.CreateModel(
+            name="HashtagBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket_start", models.DateTimeField()),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "hashtag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="buckets",
+                        to="social_media.hashtag",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="hashtagbucket",
+            index=models.Index(
+                fields=["bucket_start"], name="hashtag_bucket_start_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="hashtagbucket",
+            constraint=models.UniqueConstraint(
+                fields=("hashtag", "bucket_start"), name="unique_hashtag_bucket"
+            ),
+        ),
+    ]
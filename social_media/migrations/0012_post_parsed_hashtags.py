@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-18 07:22
+
+from django.db import migrations, models
+
+from social_media.models import parse_hashtags
+
+
+def fill_parsed_hashtags(apps, schema_editor):
+    Post = apps.get_model("social_media", "Post")
+    batch = []
+    for post in Post.objects.only("id", "message").iterator(chunk_size=1000):
+        post.parsed_hashtags = parse_hashtags(post.message)
+        batch.append(post)
+        if len(batch) == 1000:
+            Post.objects.bulk_update(batch, ["parsed_hashtags"])
+            batch = []
+    Post.objects.bulk_update(batch, ["parsed_hashtags"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0011_trending_hashtags"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="parsed_hashtags",
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.RunPython(fill_parsed_hashtags, migrations.RunPython.noop),
+    ]
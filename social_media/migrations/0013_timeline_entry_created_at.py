@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-18 07:49
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.utils.timezone
+
+
+def copy_post_created_at(apps, schema_editor):
+    Post = apps.get_model("social_media", "Post")
+    TimelineEntry = apps.get_model("social_media", "TimelineEntry")
+    TimelineEntry.objects.update(
+        created_at=Subquery(
+            Post.objects.filter(pk=OuterRef("post_id")).values("created_at")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0012_post_parsed_hashtags"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="timelineentry",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_post_created_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="timelineentry",
+            index=models.Index(
+                fields=["user", "-created_at", "-post"], name="timeline_feed_idx"
+            ),
+        ),
+    ]
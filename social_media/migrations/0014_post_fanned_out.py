@@ -0,0 +1,95 @@
+# Generated by Django 4.2 on 2026-10-18 07:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def mark_merged_posts(apps, schema_editor):
+    """
+    Posts of authors above the fan-out limit were not fanned out,
+    their followers read them merged into the feed.
+    """
+    User = apps.get_model("user", "User")
+    Follow = apps.get_model("user", "Follow")
+    Post = apps.get_model("social_media", "Post")
+    MergedAuthor = apps.get_model("social_media", "MergedAuthor")
+
+    authors = User.objects.filter(
+        followers_count__gt=settings.TIMELINE_FANOUT_MAX_FOLLOWERS
+    ).values("id")
+    Post.objects.filter(owner__in=authors).update(fanned_out=False)
+    edges = Follow.objects.filter(followee__in=authors).values_list(
+        "follower_id", "followee_id"
+    )
+    MergedAuthor.objects.bulk_create(
+        (
+            MergedAuthor(user_id=follower_id, author_id=followee_id)
+            for follower_id, followee_id in edges.iterator()
+        ),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("social_media", "0013_timeline_entry_created_at"),
+        ("user", "0005_follow_edge_table"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MergedAuthor",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="fanned_out",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("fanned_out", False)),
+                fields=["owner", "-created_at", "-id"],
+                name="post_merged_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="mergedauthor",
+            name="author",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="merged_into",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="mergedauthor",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="merged_authors",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="mergedauthor",
+            constraint=models.UniqueConstraint(
+                fields=("user", "author"), name="unique_merged_author"
+            ),
+        ),
+        migrations.RunPython(mark_merged_posts, migrations.RunPython.noop),
+    ]
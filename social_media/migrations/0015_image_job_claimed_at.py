@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0014_post_fanned_out"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="imagejob",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,38 +1,242 @@
 import os
 import re
 import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
 
 from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models import F, Q
+from django.utils import timezone
 from django.utils.text import slugify
 
 
+HASHTAG_PATTERN = re.compile(r"#(\w+)")
+
+
+def parse_hashtags(message: str) -> list[str]:
+    """
+    finds all hashtags in the message,
+    returns list with them without the leading "#"
+    """
+    return HASHTAG_PATTERN.findall(message)
+
+
 class Post(models.Model):
     message = models.TextField()
+    parsed_hashtags = models.JSONField(default=list, editable=False)
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="posts"
     )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # False when the owner had too many followers to fan the post out,
+    # such posts are merged into feeds on read.
+    fanned_out = models.BooleanField(default=True)
+    tags = models.ManyToManyField(
+        "Hashtag",
+        through="PostHashtag",
+        related_name="posts"
+    )
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(
+                fields=["owner", "created_at", "id"],
+                name="post_owner_created_idx"
+            ),
+            models.Index(
+                fields=["owner", "-created_at", "-id"],
+                condition=Q(fanned_out=False),
+                name="post_merged_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.message
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        message_changed = update_fields is None or "message" in update_fields
+        if message_changed:
+            self.parsed_hashtags = parse_hashtags(self.message)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "parsed_hashtags"}
+
+        super().save(*args, **kwargs)
+        if message_changed:
+            index_post_hashtags([self])
+        if adding:
+            count_hashtag_uses([self])
+
     def hashtags(self) -> list[str]:
         """
-        finds all hashtags and parses them,
-        returns list with all hashtags
+        returns list with all hashtags,
+        parsed from the message on save
         """
-        pattern = re.compile(r"#\w+")
-
-        matches = pattern.findall(self.message)
-        hashtags = [match[1:] for match in matches]
-        return hashtags
+        return self.parsed_hashtags
 
     def message_short(self) -> str:
         return self.message[:15]
 
 
+class Hashtag(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self) -> str:
+        return f"#{self.name}"
+
+
+class PostHashtag(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="post_hashtags"
+    )
+    hashtag = models.ForeignKey(
+        Hashtag,
+        on_delete=models.CASCADE,
+        related_name="post_hashtags"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "hashtag"],
+                name="unique_post_hashtag"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["hashtag", "post"],
+                name="post_hashtag_lookup_idx"
+            ),
+        ]
+
+
+def index_post_hashtags(posts) -> None:
+    """
+    Replaces PostHashtag rows of the given posts with hashtags
+    parsed from their messages. Tags are stored lowercased.
+    """
+    max_length = Hashtag._meta.get_field("name").max_length
+    names_by_post = {
+        post.id: {
+            tag.lower() for tag in post.hashtags() if len(tag) <= max_length
+        }
+        for post in posts
+    }
+    names = set().union(*names_by_post.values())
+
+    Hashtag.objects.bulk_create(
+        [Hashtag(name=name) for name in names],
+        ignore_conflicts=True,
+    )
+    hashtag_ids = dict(
+        Hashtag.objects.filter(name__in=names).values_list("name", "id")
+    )
+
+    PostHashtag.objects.filter(post_id__in=names_by_post).delete()
+    PostHashtag.objects.bulk_create(
+        [
+            PostHashtag(post_id=post_id, hashtag_id=hashtag_ids[name])
+            for post_id, post_names in names_by_post.items()
+            for name in post_names
+        ]
+    )
+
+
+class HashtagBucket(models.Model):
+    """
+    Number of new posts using the hashtag within one time bucket
+    of TRENDING_BUCKET_SECONDS.
+    """
+    hashtag = models.ForeignKey(
+        Hashtag,
+        on_delete=models.CASCADE,
+        related_name="buckets"
+    )
+    bucket_start = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hashtag", "bucket_start"],
+                name="unique_hashtag_bucket"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["bucket_start"],
+                name="hashtag_bucket_start_idx"
+            ),
+        ]
+
+
+class TrendingHashtag(models.Model):
+    """
+    Latest top hashtags ranking, rewritten by recompute_trending.
+    """
+    hashtag = models.OneToOneField(
+        Hashtag,
+        on_delete=models.CASCADE,
+        related_name="trending"
+    )
+    rank = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["rank"]
+
+    def __str__(self) -> str:
+        return f"{self.rank}. {self.hashtag}"
+
+
+def bucket_start(moment: datetime) -> datetime:
+    moment = moment.replace(microsecond=0)
+    offset = int(moment.timestamp()) % settings.TRENDING_BUCKET_SECONDS
+    return moment - timedelta(seconds=offset)
+
+
+def count_hashtag_uses(posts) -> None:
+    """
+    Adds one use of every hashtag of new posts to the current bucket.
+    Rows are created empty first, so concurrent posts only ever
+    increment the same row.
+    """
+    hashtag_ids = list(
+        PostHashtag.objects.filter(post__in=posts).values_list(
+            "hashtag_id", flat=True
+        )
+    )
+    if not hashtag_ids:
+        return
+
+    start = bucket_start(timezone.now())
+    HashtagBucket.objects.bulk_create(
+        [
+            HashtagBucket(hashtag_id=hashtag_id, bucket_start=start)
+            for hashtag_id in set(hashtag_ids)
+        ],
+        ignore_conflicts=True,
+    )
+    ids_by_uses = defaultdict(list)
+    for hashtag_id, uses in Counter(hashtag_ids).items():
+        ids_by_uses[uses].append(hashtag_id)
+    for uses, ids in ids_by_uses.items():
+        HashtagBucket.objects.filter(
+            hashtag_id__in=ids, bucket_start=start
+        ).update(count=F("count") + uses)
+
+
 def post_image_file_path(instance, filename):
     _, extension = os.path.splitext(filename)
     filename = f"{slugify(instance.id)}-{uuid.uuid4()}{extension}"
@@ -42,12 +246,136 @@ def post_image_file_path(instance, filename):
 
 class PostImage(models.Model):
     image = models.ImageField(null=True, upload_to=post_image_file_path)
-    title = models.CharField(max_length=55, unique=True)
+    image_renditions = models.JSONField(default=dict, blank=True)
+    position = models.PositiveSmallIntegerField(default=0)
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
         related_name="Images"
     )
 
+    class Meta:
+        ordering = ["position"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "position"],
+                name="unique_post_image_position"
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"{self.post} - {self.image.url}"
+
+
+class MediaBlob(models.Model):
+    """
+    Reference count of a content-addressed file in the media storage,
+    the file is deleted when the count drops to zero.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    ref_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.ref_count})"
+
+
+class ImageJob(models.Model):
+    """
+    Queued rendition job for an image field of any model,
+    consumed by the ``process_image_jobs`` worker.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        PROCESSING = "processing"
+        DONE = "done"
+        FAILED = "failed"
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    content_object = GenericForeignKey("content_type", "object_id")
+    field_name = models.CharField(max_length=55, default="image")
+    source_name = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="image_job_queue_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.content_type} {self.object_id} - {self.status}"
+
+
+class TimelineEntry(models.Model):
+    """
+    Materialized home timeline row: ``post`` is shown in ``user``'s feed.
+    Written at post time (fan-out-on-write) so feed reads never walk
+    the follow graph. ``created_at`` is copied from the post, so the
+    newest entries of a user are read from the index in feed order.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries"
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries"
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post"],
+                name="unique_timeline_entry"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-post"],
+                name="timeline_feed_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} - {self.post_id}"
+
+
+class MergedAuthor(models.Model):
+    """
+    Followed ``author`` whose posts were not fanned out, these are merged
+    into ``user``'s feed on read. Kept on follow and unfollow, so feed
+    reads never walk the follow graph.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="merged_authors"
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="merged_into"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "author"],
+                name="unique_merged_author"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} <- {self.author_id}"
@@ -0,0 +1,42 @@
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class PostCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the feed, pages are fetched with
+    ``created_at < cursor`` instead of OFFSET scans.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+    def get_feed_window(self, request) -> dict:
+        """
+        Keyword arguments of ``feed_for`` narrowing posts merged on read
+        to those the requested page can show.
+        """
+        cursor = self.decode_cursor(request)
+        offset, reverse, position = cursor if cursor else (0, False, None)
+        bound = None
+        if position is not None:
+            bound = (
+                Q(created_at__gt=position)
+                if reverse
+                else Q(created_at__lt=position)
+            )
+        return {
+            "bound": bound,
+            "limit": offset + self.get_page_size(request) + 1,
+            "reverse": reverse,
+        }
+
+
+class SearchPagination(LimitOffsetPagination):
+    """
+    Ranked search results have no stable keyset to page on,
+    LIMIT/OFFSET is applied to the index query instead.
+    """
+    default_limit = 20
+    max_limit = 100
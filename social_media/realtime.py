@@ -0,0 +1,127 @@
+"""
+Pub/sub hub pushing new posts to connected feed streams.
+
+Every post is published once to the channel of its author, streams
+subscribe to the channels of the authors their user follows.
+The broker is picked by REALTIME_BROKER: InMemoryBroker delivers within
+one process only, RedisBroker across all workers of the deployment.
+"""
+import asyncio
+import json
+import threading
+from functools import cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+def author_channel(author_id) -> str:
+    return f"posts:{author_id}"
+
+
+class InMemorySubscription:
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = list(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    async def get(self, timeout: float) -> dict | None:
+        """
+        Next message, or None if nothing came within ``timeout`` seconds.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def deliver(self, message: dict) -> None:
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, message)
+
+    async def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class InMemoryBroker:
+    """
+    Broker for a single process and for tests. ``publish`` may be called
+    from any thread, messages are handed to the subscriber's event loop.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def publish(self, channel: str, message: dict) -> None:
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(message)
+
+    async def subscribe(self, channels) -> InMemorySubscription:
+        subscription = InMemorySubscription(self, channels)
+        with self.lock:
+            for channel in subscription.channels:
+                self.subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription) -> None:
+        with self.lock:
+            for channel in subscription.channels:
+                subscribers = self.subscriptions.get(channel, set())
+                subscribers.discard(subscription)
+                if not subscribers:
+                    self.subscriptions.pop(channel, None)
+
+
+class RedisSubscription:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout: float) -> dict | None:
+        message = await self.pubsub.get_message(
+            ignore_subscribe_messages=True, timeout=timeout
+        )
+        return json.loads(message["data"]) if message else None
+
+    async def close(self) -> None:
+        await self.pubsub.unsubscribe()
+        await self.pubsub.close()
+
+
+class RedisBroker:
+    """
+    Broker over Redis PUBLISH/SUBSCRIBE at REDIS_URL.
+    """
+
+    def __init__(self):
+        import redis
+        import redis.asyncio
+
+        self.client = redis.Redis.from_url(settings.REDIS_URL)
+        self.async_client = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+
+    def publish(self, channel: str, message: dict) -> None:
+        self.client.publish(channel, json.dumps(message))
+
+    async def subscribe(self, channels) -> RedisSubscription:
+        pubsub = self.async_client.pubsub()
+        await pubsub.subscribe(*channels)
+        return RedisSubscription(pubsub)
+
+
+@cache
+def get_broker():
+    return import_string(settings.REALTIME_BROKER)()
+
+
+def publish_post(post) -> None:
+    """
+    Announces the post to streams of its author's followers
+    once the transaction creating it commits.
+    """
+    message = {"id": post.id, "owner_id": post.owner_id}
+    transaction.on_commit(
+        lambda: get_broker().publish(author_channel(post.owner_id), message)
+    )
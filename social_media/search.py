@@ -0,0 +1,183 @@
+import re
+
+from django.db import connection
+
+SEARCH_TABLE = "social_media_search_index"
+SEARCH_TERM = re.compile(r"\w+")
+
+POST = "post"
+PROFILE = "profile"
+
+
+class SQLiteSearchBackend:
+    """
+    FTS5 virtual table, results are ranked by bm25.
+    """
+
+    def create_table(self, cursor) -> None:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            "kind UNINDEXED, object_id UNINDEXED, body, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+    def drop_table(self, cursor) -> None:
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def match_query(self, terms: list[str]) -> str:
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def match_sql(self, kind: str | None) -> tuple[str, list]:
+        sql = f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s"
+        if kind:
+            return f"{sql} AND kind = %s", [kind]
+        return sql, []
+
+    def rank_sql(self) -> str:
+        return "rank"
+
+    def order_sql(self) -> str:
+        return "rank, object_id DESC"
+
+
+class PostgreSQLSearchBackend:
+    """
+    Table with a generated ``tsvector`` column under a GIN index,
+    results are ranked by ``ts_rank``.
+    """
+
+    def create_table(self, cursor) -> None:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+            "kind varchar(16) NOT NULL, "
+            "object_id bigint NOT NULL, "
+            "body text NOT NULL, "
+            "document tsvector GENERATED ALWAYS AS "
+            "(to_tsvector('simple', body)) STORED, "
+            "PRIMARY KEY (kind, object_id))"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx "
+            f"ON {SEARCH_TABLE} USING GIN (document)"
+        )
+
+    def drop_table(self, cursor) -> None:
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def match_query(self, terms: list[str]) -> str:
+        return " & ".join(f"{term}:*" for term in terms)
+
+    def match_sql(self, kind: str | None) -> tuple[str, list]:
+        sql = (
+            f"FROM {SEARCH_TABLE}, to_tsquery('simple', %s) query "
+            "WHERE document @@ query"
+        )
+        if kind:
+            return f"{sql} AND kind = %s", [kind]
+        return sql, []
+
+    def rank_sql(self) -> str:
+        return "-ts_rank(document, query)"
+
+    def order_sql(self) -> str:
+        return "ts_rank(document, query) DESC, object_id DESC"
+
+
+BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgreSQLSearchBackend,
+}
+
+
+def get_backend(using=None):
+    vendor = (using or connection).vendor
+    try:
+        return BACKENDS[vendor]()
+    except KeyError:
+        raise NotImplementedError(f"Full-text search is not set up for {vendor}")
+
+
+def post_document(post) -> str:
+    return post.message
+
+
+def profile_document(user) -> str:
+    return " ".join(
+        filter(None, [user.email, user.first_name, user.last_name, user.bio])
+    )
+
+
+def index_documents(kind: str, documents: dict[int, str]) -> None:
+    """
+    Replaces index rows of ``kind`` for the given ``{object_id: body}``.
+    """
+    if not documents:
+        return
+    remove_documents(kind, documents)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (kind, object_id, body) "
+            "VALUES (%s, %s, %s)",
+            [(kind, pk, body) for pk, body in documents.items()],
+        )
+
+
+def remove_documents(kind: str, object_ids) -> None:
+    object_ids = list(object_ids)
+    if not object_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(object_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} "
+            f"WHERE kind = %s AND object_id IN ({placeholders})",
+            [kind, *object_ids],
+        )
+
+
+class SearchResults:
+    """
+    Lazy ranked result set answered from the index only. Supports
+    ``count()`` and slicing, so DRF paginators can page through it
+    with LIMIT/OFFSET. Items are ``(kind, object_id, rank)`` tuples.
+    """
+
+    def __init__(self, query: str, kind: str | None = None):
+        self.backend = get_backend()
+        self.terms = [term.lower() for term in SEARCH_TERM.findall(query)]
+        self.kind = kind
+
+    def _sql(self) -> tuple[str, list]:
+        match_sql, params = self.backend.match_sql(self.kind)
+        return match_sql, [self.backend.match_query(self.terms), *params]
+
+    def count(self) -> int:
+        if not self.terms:
+            return 0
+        match_sql, params = self._sql()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) {match_sql}", params)
+            return cursor.fetchone()[0]
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __getitem__(self, item: slice) -> list[tuple[str, int, float]]:
+        start = item.start or 0
+        if not self.terms or item.stop is not None and item.stop <= start:
+            return []
+        match_sql, params = self._sql()
+        limit = -1 if item.stop is None else item.stop - start
+        if connection.vendor == "postgresql" and limit == -1:
+            limit = None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT kind, object_id, {self.backend.rank_sql()} "
+                f"{match_sql} ORDER BY {self.backend.order_sql()} "
+                "LIMIT %s OFFSET %s",
+                [*params, limit, start],
+            )
+            return [
+                (kind, int(object_id), rank)
+                for kind, object_id, rank in cursor.fetchall()
+            ]
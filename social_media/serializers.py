@@ -1,27 +1,112 @@
-import uuid
-
+from django.conf import settings
 from django.db import transaction
 from rest_framework import serializers
-from rest_framework.reverse import reverse
 
-from social_media.models import Post, PostImage
+from social_media.images import enqueue_image_jobs, rendition_url
+from social_media.links import url_builder
+from social_media.models import Post, PostImage, TrendingHashtag
+from social_media.realtime import publish_post
+from social_media.timeline import fan_out_post
+from social_media.uploads import attach_image_upload, get_image_upload
+
+
+def post_gallery(post):
+    """
+    Returns ordered images of the post, reading ``gallery``
+    prefetched by the views when it is available.
+    """
+    gallery = getattr(post, "gallery", None)
+    if gallery is None:
+        gallery = list(post.Images.all())
+    return gallery
+
+
+class RenditionImageField(serializers.ImageField):
+    """
+    Image field representing the file by URL of one of its renditions.
+    """
+
+    def __init__(self, rendition, **kwargs):
+        self.rendition = rendition
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        renditions = getattr(value.instance, f"{value.field.name}_renditions", {})
+        url = rendition_url(value, renditions, self.rendition)
+        request = self.context.get("request")
+        if url and request:
+            return url_builder(request).absolute(url)
+        return url
+
+
+class DetailLinkField(serializers.ReadOnlyField):
+    """
+    Absolute URL of ``view_name`` for the object, built from
+    the route template cached for the request.
+    """
+
+    def __init__(self, view_name, **kwargs):
+        self.view_name = view_name
+        kwargs["source"] = "*"
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return url_builder(self.context["request"]).reverse(
+            self.view_name, value.pk
+        )
 
 
 class PostImageUploadSerializer(serializers.ModelSerializer):
     class Meta:
         model = PostImage
-        fields = ("image", "title")
+        fields = ("image", "position")
+
+
+class PostGalleryMixin:
+    """
+    Serializes ``image`` and ``images`` of a post as absolute URLs
+    of their ``image_rendition`` renditions.
+    """
+    image_rendition = "full"
+
+    def get_image(self, obj):
+        gallery = post_gallery(obj)
+        return self.image_url(gallery[0]) if gallery else None
+
+    def get_images(self, obj):
+        return [self.image_url(image) for image in post_gallery(obj)]
+
+    def image_url(self, image):
+        url = rendition_url(
+            image.image, image.image_renditions, self.image_rendition
+        )
+        return url_builder(self.context.get("request")).absolute(url)
 
 
-class PostListSerializer(serializers.ModelSerializer):
+class PostListSerializer(PostGalleryMixin, serializers.ModelSerializer):
+    image_rendition = "feed"
+
     owner_email = serializers.ReadOnlyField(source="owner.email")
-    hashtags = serializers.SerializerMethodField()
-    message_link = serializers.SerializerMethodField()
+    hashtags = serializers.ReadOnlyField(source="parsed_hashtags")
+    message_link = DetailLinkField("api:post-detail")
     image = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
 
     image_upload = serializers.ImageField(
         allow_empty_file=True,
         allow_null=True,
+        required=False,
+        write_only=True,
+    )
+    images_upload = serializers.ListField(
+        child=serializers.ImageField(),
+        max_length=settings.POST_GALLERY_MAX_IMAGES,
+        required=False,
+        write_only=True,
+    )
+    image_upload_id = serializers.CharField(
+        max_length=22,
+        required=False,
         write_only=True,
     )
 
@@ -34,41 +119,89 @@ class PostListSerializer(serializers.ModelSerializer):
             "message",
             "message_link",
             "image",
-            "image_upload"
+            "images",
+            "image_upload",
+            "images_upload",
+            "image_upload_id",
         )
         extra_kwargs = {"message": {"write_only": True, "min_length": 1}}
 
-    def get_hashtags(self, obj):
-        return obj.hashtags()
-
-    def get_message_link(self, obj):
-        request = self.context.get("request")
-        return request.build_absolute_uri(reverse("api:post-detail", args=[obj.id]))
+    def validate_image_upload_id(self, value):
+        return get_image_upload(value, self.context["request"].user)
 
-    def get_image(self, obj):
-        request = self.context.get("request")
-        if obj.Images.exists():
-            image = obj.Images.first()
-            return request.build_absolute_uri(image.image.url)
-        return None
+    def validate(self, attrs):
+        images = (
+            bool(attrs.get("image_upload"))
+            + len(attrs.get("images_upload", []))
+            + bool(attrs.get("image_upload_id"))
+        )
+        if images > settings.POST_GALLERY_MAX_IMAGES:
+            raise serializers.ValidationError(
+                f"A post can have at most "
+                f"{settings.POST_GALLERY_MAX_IMAGES} images."
+            )
+        return attrs
 
     @transaction.atomic
     def create(self, validated_data):
         image = validated_data.pop("image_upload", None)
+        images = validated_data.pop("images_upload", [])
+        upload = validated_data.pop("image_upload_id", None)
         owner_id = self.context["request"].user.id
         post = Post.objects.create(owner_id=owner_id, **validated_data)
 
         if image:
-            title = f"{post.id}-{uuid.uuid4()}"
-            PostImage.objects.create(image=image, title=title, post=post)
+            images.insert(0, image)
+        post_images = PostImage.objects.bulk_create(
+            [
+                PostImage(post=post, position=position, image=image)
+                for position, image in enumerate(images)
+            ]
+        )
+        enqueue_image_jobs(post_images)
+        if upload:
+            attach_image_upload(post, upload)
+
+        fan_out_post(post)
+        publish_post(post)
 
         return post
 
 
-class PostDetailSerializer(serializers.ModelSerializer):
+class PostFeedSerializer(serializers.BaseSerializer):
+    """
+    Read-only fast path of PostListSerializer for list responses:
+    builds the same representation in one method, without binding
+    and dispatching a field per attribute on every row.
+    """
+    image_rendition = "feed"
+
+    def to_representation(self, instance):
+        urls = url_builder(self.context["request"])
+        images = [
+            urls.absolute(
+                rendition_url(
+                    image.image, image.image_renditions, self.image_rendition
+                )
+            )
+            for image in post_gallery(instance)
+        ]
+
+        return {
+            "owner_email": instance.owner.email,
+            "hashtags": instance.parsed_hashtags,
+            "message_short": instance.message[:15],
+            "message_link": urls.reverse("api:post-detail", instance.id),
+            "image": images[0] if images else None,
+            "images": images,
+        }
+
+
+class PostDetailSerializer(PostGalleryMixin, serializers.ModelSerializer):
     owner_email = serializers.ReadOnlyField(source="owner.email")
-    hashtags = serializers.SerializerMethodField()
+    hashtags = serializers.ReadOnlyField(source="parsed_hashtags")
     image = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
@@ -77,14 +210,33 @@ class PostDetailSerializer(serializers.ModelSerializer):
             "message",
             "owner_email",
             "image",
+            "images",
         )
 
-    def get_hashtags(self, obj):
-        return obj.hashtags()
 
-    def get_image(self, obj):
-        request = self.context.get("request")
-        if obj.Images.exists():
-            image = obj.Images.first()
-            return request.build_absolute_uri(image.image.url)
-        return None
+class PostImageAttachSerializer(serializers.Serializer):
+    upload_id = serializers.CharField(max_length=22, write_only=True)
+    id = serializers.IntegerField(read_only=True)
+    image = serializers.ImageField(read_only=True)
+
+    def validate_upload_id(self, value):
+        post = self.context["post"]
+        if post.Images.count() >= settings.POST_GALLERY_MAX_IMAGES:
+            raise serializers.ValidationError(
+                f"A post can have at most "
+                f"{settings.POST_GALLERY_MAX_IMAGES} images."
+            )
+        return get_image_upload(value, self.context["request"].user)
+
+    def create(self, validated_data):
+        return attach_image_upload(
+            self.context["post"], validated_data["upload_id"]
+        )
+
+
+class TrendingHashtagSerializer(serializers.ModelSerializer):
+    name = serializers.ReadOnlyField(source="hashtag.name")
+
+    class Meta:
+        model = TrendingHashtag
+        fields = ("rank", "name", "count", "computed_at")
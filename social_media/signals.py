@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from social_media.caching import invalidate_responses
+from social_media.models import Post, PostImage
+from social_media.search import (
+    POST,
+    index_documents,
+    post_document,
+    remove_documents,
+)
+from social_media.storage import release_names
+
+
+@receiver(post_delete, sender=PostImage)
+def release_post_image(sender, instance, **kwargs):
+    if instance.image:
+        release_names(
+            instance.image.storage,
+            [instance.image.name, *instance.image_renditions.values()],
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def drop_cached_post(sender, instance, **kwargs):
+    invalidate_responses("post", [instance.pk])
+
+
+@receiver(post_save, sender=PostImage)
+@receiver(post_delete, sender=PostImage)
+def drop_cached_post_of_image(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id).update(updated_at=timezone.now())
+    invalidate_responses("post", [instance.post_id])
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or "message" in update_fields:
+        index_documents(POST, {instance.pk: post_document(instance)})
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    remove_documents(POST, [instance.pk])
@@ -0,0 +1,101 @@
+import hashlib
+import os
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+class ContentAddressedStorageMixin:
+    """
+    Stores every file once under the SHA-256 digest of its content,
+    keeping the directory and extension of the requested name.
+    Each save of a name takes a reference in MediaBlob, ``release``
+    drops it and the file is deleted once the transaction releasing
+    the last reference commits.
+
+    Combine with any Django storage, e.g. ``S3Boto3Storage``
+    of django-storages, the local one is ContentAddressedFileSystemStorage.
+    """
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+
+        directory = os.path.dirname(name)
+        _, extension = os.path.splitext(name)
+        hexdigest = digest.hexdigest()
+        name = os.path.join(
+            directory, hexdigest[:2], f"{hexdigest}{extension.lower()}"
+        )
+
+        # The reference is taken before the file is checked, so a release
+        # collecting the same file either waits for it or sees the count.
+        with transaction.atomic():
+            self.acquire(name)
+            if not self.exists(name):
+                name = super()._save(name, content)
+        return name
+
+    def acquire(self, name: str) -> None:
+        MediaBlob = apps.get_model("social_media", "MediaBlob")
+        updated = MediaBlob.objects.filter(name=name).update(
+            ref_count=F("ref_count") + 1
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    MediaBlob.objects.create(name=name, ref_count=1)
+            except IntegrityError:
+                self.acquire(name)
+
+    def release(self, name: str) -> None:
+        """
+        Drops one reference to the file. Files not saved through
+        this storage have no MediaBlob and are left alone.
+        """
+        MediaBlob = apps.get_model("social_media", "MediaBlob")
+        blobs = MediaBlob.objects.filter(name=name, ref_count__gt=0)
+        if not blobs.update(ref_count=F("ref_count") - 1):
+            return
+
+        if MediaBlob.objects.filter(name=name, ref_count=0).exists():
+            transaction.on_commit(lambda: self.collect(name))
+
+    def collect(self, name: str) -> None:
+        """
+        Deletes the file and its MediaBlob unless a save referenced
+        the file again since the count dropped to zero.
+        """
+        MediaBlob = apps.get_model("social_media", "MediaBlob")
+        with transaction.atomic():
+            blob = (
+                MediaBlob.objects.select_for_update()
+                .filter(name=name, ref_count=0)
+                .first()
+            )
+            if blob is None:
+                return
+            blob.delete()
+            self.delete(name)
+
+
+class ContentAddressedFileSystemStorage(
+    ContentAddressedStorageMixin, FileSystemStorage
+):
+    pass
+
+
+def release_names(storage, names) -> None:
+    """
+    Releases references to the files in storages that count them.
+    """
+    release = getattr(storage, "release", None)
+    if release is None:
+        return
+    for name in names:
+        if name:
+            release(name)
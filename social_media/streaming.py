@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.compat import LONG_SEPARATORS, SHORT_SEPARATORS
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import JSONRenderer
+
+
+class JSONStreamRenderer(JSONRenderer):
+    """
+    Renders items of an iterable as a JSON array chunk by chunk,
+    encoded the same way as by JSONRenderer.
+    """
+
+    def render_stream(self, items, chunk_size: int):
+        separators = SHORT_SEPARATORS if self.compact else LONG_SEPARATORS
+        encoder = self.encoder_class(
+            ensure_ascii=self.ensure_ascii, separators=separators
+        )
+        chunk = []
+        delimiter = "["
+        for item in items:
+            chunk.append(delimiter)
+            chunk.append(encoder.encode(item))
+            delimiter = ","
+            if len(chunk) >= chunk_size * 2:
+                yield self.encode_chunk(chunk)
+                chunk = []
+        chunk.append("]" if delimiter == "," else "[]")
+        yield self.encode_chunk(chunk)
+
+    @staticmethod
+    def encode_chunk(chunk) -> bytes:
+        text = "".join(chunk)
+        # Escaped like JSONRenderer does, for JSON embedded in JavaScript.
+        return (
+            text.replace("\u2028", "\\u2028")
+            .replace("\u2029", "\\u2029")
+            .encode()
+        )
+
+
+class StreamingListMixin:
+    """
+    ``?stream=1`` sends the whole filtered list unpaginated in a
+    StreamingHttpResponse. Rows are read with ``iterator(chunk_size)``
+    and serialized one by one, so memory does not grow with the list.
+    Only users passing ``stream_permission_classes`` (staff by default)
+    can stream, the others get the paginated list.
+    """
+    stream_param = "stream"
+    stream_permission_classes = [IsAdminUser]
+
+    def list(self, request, *args, **kwargs):
+        if not self.should_stream(request):
+            return super().list(request, *args, **kwargs)
+
+        chunk_size = settings.STREAMING_CHUNK_SIZE
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        items = (
+            serializer.to_representation(instance)
+            for instance in queryset.iterator(chunk_size=chunk_size)
+        )
+        return StreamingHttpResponse(
+            JSONStreamRenderer().render_stream(items, chunk_size),
+            content_type="application/json",
+        )
+
+    def should_stream(self, request) -> bool:
+        if request.query_params.get(self.stream_param) not in ("1", "true"):
+            return False
+        return all(
+            permission().has_permission(request, self)
+            for permission in self.stream_permission_classes
+        )
@@ -1,3 +1,754 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import shutil
+import tempfile
+import uuid
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django_drf_filepond.models import TemporaryUpload
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from social_media.images import (
+    claim_image_jobs,
+    enqueue_image_job,
+    finish_image_job,
+    read_job_source,
+    render_renditions,
+    store_renditions,
+)
+from social_media.models import ImageJob, MediaBlob, Post, PostImage
+from social_media.realtime import author_channel, get_broker
+from social_media.serializers import PostFeedSerializer, PostListSerializer
+from social_media.storage import ContentAddressedFileSystemStorage
+from social_media.timeline import fan_out_post, feed_for, trim_timelines
+from social_media.trending import recompute_trending
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def sample_image(name="image.png", color="black"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (10, 10), color).save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/png")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PostQueryCountTests(TestCase):
+    """
+    Rendering a page of posts must cost a fixed number of queries,
+    whatever the number of posts on it.
+    """
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "reader@test.com", "password123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_posts(self, count):
+        for index in range(count):
+            post = Post.objects.create(
+                owner=self.user, message=f"post {index} #tag"
+            )
+            PostImage.objects.bulk_create(
+                [
+                    PostImage(
+                        post=post, position=position, image=sample_image()
+                    )
+                    for position in range(2)
+                ]
+            )
+            fan_out_post(post)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_post_list_queries_do_not_grow_with_page_size(self):
+        url = reverse("api:post-list")
+        self.create_posts(2)
+        small_page = self.count_queries(url)
+
+        self.create_posts(18)
+        full_page = self.count_queries(url)
+
+        self.assertEqual(small_page, full_page)
+
+    def test_post_list_returns_images(self):
+        self.create_posts(3)
+
+        response = self.client.get(reverse("api:post-list"))
+
+        links = [
+            f"http://testserver{reverse('api:post-detail', args=[post.id])}"
+            for post in Post.objects.all()
+        ]
+        for post in response.data["results"]:
+            self.assertTrue(post["image"].startswith("http://testserver/"))
+            self.assertEqual(post["owner_email"], self.user.email)
+        self.assertEqual(
+            [post["message_link"] for post in response.data["results"]], links
+        )
+
+    def test_create_post_with_gallery_only(self):
+        response = self.client.post(
+            reverse("api:post-list"),
+            {
+                "message": "gallery",
+                "images_upload": [sample_image(), sample_image("b.png")],
+            },
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        post = Post.objects.get()
+        self.assertEqual(
+            list(post.Images.values_list("position", flat=True)), [0, 1]
+        )
+
+    def test_feed_serializer_matches_list_serializer(self):
+        self.create_posts(1)
+        post = Post.objects.get()
+        context = {"request": self.client.get("/").wsgi_request}
+
+        self.assertEqual(
+            PostFeedSerializer(post, context=context).data,
+            PostListSerializer(post, context=context).data,
+        )
+
+    def test_post_detail_query_count(self):
+        self.create_posts(1)
+        post = Post.objects.get()
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("api:post-detail", args=[post.id])
+            )
+
+        self.assertIsNotNone(response.data["image"])
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        self.storage = ContentAddressedFileSystemStorage(location=location)
+
+    def save(self, name="uploads/a.png", content=b"same"):
+        return self.storage.save(name, ContentFile(content))
+
+    def ref_count(self, name):
+        return MediaBlob.objects.get(name=name).ref_count
+
+    def test_equal_content_is_stored_once(self):
+        first = self.save("uploads/a.png")
+        second = self.save("uploads/b.PNG")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.ref_count(first), 2)
+        self.assertNotEqual(self.save(content=b"other"), first)
+
+    def test_file_is_deleted_with_last_reference(self):
+        name = self.save()
+        self.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.release(name)
+        self.assertTrue(self.storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.release(name)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    def test_save_after_last_release_keeps_file(self):
+        name = self.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.release(name)
+            # Another request saves the same content before the commit.
+            self.save()
+
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.ref_count(name), 1)
+
+    def test_unknown_files_are_not_released(self):
+        self.storage.release("uploads/unknown.png")
+
+        self.assertFalse(MediaBlob.objects.exists())
+
+
+class RenderRenditionsTests(TestCase):
+    def test_shrinks_and_drops_exif(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotated 90 degrees clockwise.
+        exif[0x010E] = "secret description"
+        buffer = io.BytesIO()
+        Image.new("RGB", (400, 200)).save(buffer, format="JPEG", exif=exif)
+
+        renditions = render_renditions(
+            buffer.getvalue(), {"small": 100, "large": 1000}, "JPEG"
+        )
+
+        with Image.open(io.BytesIO(renditions["small"])) as small:
+            self.assertEqual(small.size, (50, 100))
+            self.assertEqual(dict(small.getexif()), {})
+        with Image.open(io.BytesIO(renditions["large"])) as large:
+            self.assertEqual(large.size, (200, 400))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_JOB_MAX_ATTEMPTS=2)
+class ImageJobTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "owner@test.com", "password123", image=sample_image()
+        )
+        enqueue_image_job(self.user)
+        self.job = ImageJob.objects.get()
+
+    def replace_image(self):
+        self.user.image = sample_image(color="white")
+        self.user.save()
+
+    def test_failed_job_is_retried_until_max_attempts(self):
+        [job] = claim_image_jobs(10)
+        finish_image_job(job, error="broken")
+        job.refresh_from_db()
+        self.assertEqual(
+            (job.status, job.attempts), (ImageJob.Status.PENDING, 1)
+        )
+
+        [job] = claim_image_jobs(10)
+        finish_image_job(job, error="broken")
+        job.refresh_from_db()
+        self.assertEqual(
+            (job.status, job.attempts), (ImageJob.Status.FAILED, 2)
+        )
+        self.assertEqual(claim_image_jobs(10), [])
+
+    def test_jobs_of_dead_workers_are_claimed_again(self):
+        claim_image_jobs(10)
+        self.assertEqual(claim_image_jobs(10), [])
+
+        ImageJob.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+        [job] = claim_image_jobs(10)
+        self.assertEqual(job.attempts, 2)
+
+        ImageJob.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(claim_image_jobs(10), [])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ImageJob.Status.FAILED)
+
+    def test_renditions_are_stored(self):
+        [job] = claim_image_jobs(10)
+        store_renditions(
+            job, render_renditions(read_job_source(job), {"small": 5}, "PNG")
+        )
+
+        self.user.refresh_from_db()
+        self.assertEqual(list(self.user.image_renditions), ["small"])
+
+    def test_replaced_image_is_skipped(self):
+        self.replace_image()
+
+        self.assertIsNone(read_job_source(self.job))
+
+    def test_image_replaced_while_rendering_keeps_no_renditions(self):
+        data = read_job_source(self.job)
+        self.replace_image()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            store_renditions(
+                self.job, render_renditions(data, {"small": 5}, "PNG")
+            )
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.image_renditions, {})
+        self.assertFalse(
+            MediaBlob.objects.filter(
+                name__startswith="uploads/renditions/"
+            ).exists()
+        )
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT, POST_GALLERY_MAX_IMAGES=2, POST_IMAGE_MAX_PIXELS=400
+)
+class PostImageAttachTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user("owner@test.com", "password123")
+        self.other = User.objects.create_user("other@test.com", "password123")
+        self.post = Post.objects.create(owner=self.user, message="gallery")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("api:post-image-attach", args=[self.post.id])
+        self.addCleanup(lambda: TemporaryUpload.objects.all().delete())
+
+    def create_upload(self, content=None, user=None):
+        content = content or sample_image().read()
+        return TemporaryUpload.objects.create(
+            upload_id=uuid.uuid4().hex[:22],
+            file_id=uuid.uuid4().hex[:22],
+            file=SimpleUploadedFile("upload.png", content),
+            upload_name="upload.png",
+            upload_type=TemporaryUpload.FILE_DATA,
+            uploaded_by=user or self.user,
+        )
+
+    def attach(self, upload):
+        return self.client.post(self.url, {"upload_id": upload.upload_id})
+
+    def test_attach_numbers_positions_and_removes_upload(self):
+        uploads = [self.create_upload() for _ in range(3)]
+
+        responses = [self.attach(upload) for upload in uploads]
+
+        self.assertEqual(
+            [response.status_code for response in responses], [201, 201, 400]
+        )
+        self.assertEqual(
+            list(self.post.Images.values_list("position", flat=True)), [0, 1]
+        )
+        self.assertEqual(list(TemporaryUpload.objects.all()), [uploads[2]])
+
+    def test_non_image_is_rejected(self):
+        response = self.attach(self.create_upload(b"not an image"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.post.Images.exists())
+
+    def test_oversized_image_is_rejected(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (30, 30)).save(buffer, format="PNG")
+
+        response = self.attach(self.create_upload(buffer.getvalue()))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("too large", str(response.data))
+
+    def test_upload_of_another_user_is_rejected(self):
+        response = self.attach(self.create_upload(user=self.other))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(TemporaryUpload.objects.count(), 1)
+
+    def test_post_of_another_user_is_not_found(self):
+        self.client.force_authenticate(self.other)
+
+        response = self.attach(self.create_upload(user=self.other))
+
+        self.assertEqual(response.status_code, 404)
+
+
+class PostListConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "reader@test.com", "password123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        fan_out_post(Post.objects.create(owner=self.user, message="first"))
+
+    def test_unchanged_feed_is_not_modified(self):
+        url = reverse("api:post-list")
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_post_changes_etag(self):
+        url = reverse("api:post-list")
+        etag = self.client.get(url)["ETag"]
+        fan_out_post(Post.objects.create(owner=self.user, message="second"))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class PostDetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            "owner@test.com", "password123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(owner=self.user, message="first")
+        self.url = reverse("api:post-detail", args=[self.post.id])
+
+    def test_cached_detail_is_served_without_queries(self):
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_update_invalidates_cached_detail(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.client.patch(self.url, {"message": "edited"}, format="json")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["message"], "edited")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_owner_email_change_invalidates_cached_detail(self):
+        self.client.get(self.url)
+
+        self.user.email = "renamed@test.com"
+        self.user.save()
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data["owner_email"], "renamed@test.com")
+
+
+@override_settings(TIMELINE_MAX_ENTRIES=2)
+class TimelineCapTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "reader@test.com", "password123"
+        )
+        self.posts = [
+            Post.objects.create(owner=self.user, message=f"post {index}")
+            for index in range(3)
+        ]
+        for post in self.posts:
+            fan_out_post(post)
+
+    def test_feed_reads_newest_entries(self):
+        self.assertEqual(
+            list(feed_for(self.user)), [self.posts[2], self.posts[1]]
+        )
+
+    def test_trim_keeps_newest_entries(self):
+        self.assertEqual(trim_timelines(), 1)
+
+        self.assertEqual(
+            set(self.user.timeline_entries.values_list("post", flat=True)),
+            {self.posts[2].id, self.posts[1].id},
+        )
+        self.assertEqual(trim_timelines(), 0)
+
+
+@override_settings(TIMELINE_FANOUT_MAX_FOLLOWERS=1)
+class MergedAuthorFeedTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.author, self.reader, other = [
+            User.objects.create_user(f"{name}@test.com", "password123")
+            for name in ("author", "reader", "other")
+        ]
+        self.reader.follow(self.author)
+        other.follow(self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def post(self, message):
+        post = Post.objects.create(owner=self.author, message=message)
+        fan_out_post(post)
+        return post
+
+    def messages(self, response):
+        return [post["message_short"] for post in response.data["results"]]
+
+    def test_post_stays_merged_after_followers_drop(self):
+        post = self.post("while celebrity")
+        post.refresh_from_db()
+        self.assertFalse(post.fanned_out)
+        self.assertFalse(self.reader.timeline_entries.exists())
+
+        with override_settings(TIMELINE_FANOUT_MAX_FOLLOWERS=10):
+            self.assertEqual(list(feed_for(self.reader)), [post])
+
+    def test_unfollow_stops_merging(self):
+        self.post("while celebrity")
+        self.client.delete(reverse("users:follow", args=[self.author.id]))
+
+        self.assertEqual(list(feed_for(self.reader)), [])
+
+        self.client.put(reverse("users:follow", args=[self.author.id]))
+        self.assertEqual(len(feed_for(self.reader)), 1)
+
+    def test_pages_mix_merged_and_timeline_posts(self):
+        for index in range(3):
+            self.post(f"merged {index}")
+            fan_out_post(
+                Post.objects.create(owner=self.reader, message=f"own {index}")
+            )
+
+        pages = [self.client.get(reverse("api:post-list"), {"page_size": 2})]
+        while pages[-1].data["next"]:
+            pages.append(self.client.get(pages[-1].data["next"]))
+
+        self.assertEqual(
+            [self.messages(page) for page in pages],
+            [
+                ["own 2", "merged 2"],
+                ["own 1", "merged 1"],
+                ["own 0", "merged 0"],
+            ],
+        )
+        previous = self.client.get(pages[-1].data["previous"])
+        self.assertEqual(self.messages(previous), ["own 1", "merged 1"])
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "searcher@test.com", "password123", first_name="Ada"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, **params):
+        response = self.client.get(reverse("api:search"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_finds_posts_and_profiles(self):
+        post = Post.objects.create(owner=self.user, message="Adaptive designs")
+        Post.objects.create(owner=self.user, message="unrelated")
+
+        data = self.search(q="ada")
+
+        found = {(item["type"], item["id"]) for item in data["results"]}
+        self.assertEqual(data["count"], 2)
+        self.assertEqual(found, {("post", post.id), ("profile", self.user.id)})
+
+    def test_index_follows_edits_and_deletes(self):
+        post = Post.objects.create(owner=self.user, message="old words")
+        post.message = "fresh words"
+        post.save()
+
+        self.assertEqual(self.search(q="old")["count"], 0)
+        self.assertEqual(self.search(q="fresh", type="post")["count"], 1)
+
+        post.delete()
+        self.assertEqual(self.search(q="fresh")["count"], 0)
+
+    def test_anonymous_search_is_unauthorized(self):
+        self.client.force_authenticate(None)
+
+        response = self.client.get(
+            reverse("api:search"), {"q": "ada", "type": "profile"}
+        )
+
+        self.assertEqual(response.status_code, 401)
+
+
+class TrendingHashtagTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "writer@test.com", "password123"
+        )
+
+    def test_ranks_hashtags_by_recent_uses(self):
+        for message in ["#django #python", "#Python", "#python #rust"]:
+            Post.objects.create(owner=self.user, message=message)
+        recompute_trending()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("api:trending-hashtags"))
+
+        ranking = [(tag["name"], tag["count"]) for tag in response.data]
+        self.assertEqual(ranking, [("python", 3), ("django", 1), ("rust", 1)])
+
+    def test_edits_do_not_count_again(self):
+        post = Post.objects.create(owner=self.user, message="#python")
+        post.message = "#python again"
+        post.save()
+        recompute_trending()
+
+        response = self.client.get(reverse("api:trending-hashtags"))
+
+        self.assertEqual(response.data[0]["count"], 1)
+
+
+class PostHashtagsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "writer@test.com", "password123"
+        )
+
+    def test_hashtags_are_parsed_on_save(self):
+        post = Post.objects.create(owner=self.user, message="hi #one #two")
+        post.message = "now #three"
+        post.save(update_fields=["message"])
+
+        post.refresh_from_db()
+        self.assertEqual(post.parsed_hashtags, ["three"])
+        self.assertEqual(
+            list(post.tags.values_list("name", flat=True)), ["three"]
+        )
+
+
+class HashtagFilterTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "reader@test.com", "password123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for message in ("short #Py", "long #python", "web #django"):
+            fan_out_post(Post.objects.create(owner=self.user, message=message))
+
+    def filtered(self, hashtags):
+        response = self.client.get(
+            reverse("api:post-list"), {"hashtags": hashtags}
+        )
+        return {post["message_short"] for post in response.data["results"]}
+
+    def test_matches_whole_tags_only(self):
+        self.assertEqual(self.filtered("py"), {"short #Py"})
+        self.assertEqual(self.filtered("pyth"), set())
+
+    def test_ignores_case(self):
+        self.assertEqual(self.filtered("PYTHON"), {"long #python"})
+
+    def test_accepts_hash_prefixed_comma_separated_tags(self):
+        self.assertEqual(
+            self.filtered("#python, #Django"),
+            {"long #python", "web #django"},
+        )
+
+
+class AsyncPostListTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "reader@test.com", "password123"
+        )
+        token = AccessToken.for_user(self.user)
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        for index in range(3):
+            fan_out_post(
+                Post.objects.create(owner=self.user, message=f"post {index}")
+            )
+
+    def test_requires_token(self):
+        response = self.client.get(reverse("api:post-list-async"))
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_pages_follow_the_sync_feed(self):
+        url = reverse("api:post-list-async")
+        first = self.client.get(url, {"page_size": 2}, **self.auth).json()
+        second = self.client.get(first["next"], **self.auth).json()
+
+        messages = [
+            post["message_short"]
+            for post in first["results"] + second["results"]
+        ]
+        self.assertEqual(messages, ["post 2", "post 1", "post 0"])
+        self.assertIsNone(second["next"])
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    REALTIME_BROKER="social_media.realtime.InMemoryBroker",
+)
+class PostPublishTests(TestCase):
+    def setUp(self):
+        get_broker.cache_clear()
+        self.author = get_user_model().objects.create_user(
+            "author@test.com", "password123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.addCleanup(get_broker.cache_clear)
+
+    def subscribe(self, author):
+        return self.loop.run_until_complete(
+            get_broker().subscribe([author_channel(author.id)])
+        )
+
+    def test_created_post_is_published_on_commit(self):
+        subscription = self.subscribe(self.author)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("api:post-list"),
+                {"message": "live", "image_upload": sample_image()},
+                format="multipart",
+            )
+
+        message = self.loop.run_until_complete(subscription.get(timeout=1))
+        self.assertEqual(
+            message, {"id": Post.objects.get().id, "owner_id": self.author.id}
+        )
+
+
+@override_settings(STREAMING_CHUNK_SIZE=2)
+class PostListStreamingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "reader@test.com", "password123", is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_streamed_list_matches_pages(self):
+        for index in range(5):
+            fan_out_post(
+                Post.objects.create(owner=self.user, message=f"post {index}")
+            )
+        url = reverse("api:post-list")
+
+        response = self.client.get(url, {"stream": "1"})
+        streamed = json.loads(b"".join(response.streaming_content))
+
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(streamed, self.client.get(url).json()["results"])
+
+    def test_empty_stream_is_empty_array(self):
+        response = self.client.get(reverse("api:post-list"), {"stream": "1"})
+
+        self.assertEqual(b"".join(response.streaming_content), b"[]")
+
+    def test_non_staff_gets_paginated_list(self):
+        fan_out_post(Post.objects.create(owner=self.user, message="post"))
+        self.user.is_staff = False
+        self.user.save()
+        url = reverse("api:post-list")
+
+        response = self.client.get(url, {"stream": "1"})
+
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIn("next", response.data)
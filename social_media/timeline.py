@@ -0,0 +1,159 @@
+from django.conf import settings
+from django.db.models import Count, Q
+
+from social_media.models import MergedAuthor, Post, TimelineEntry
+
+
+def audience_of(author):
+    """
+    Users whose feed shows posts of ``author``.
+    """
+    return author.followers.all()
+
+
+def fan_out_post(post: Post) -> None:
+    """
+    Pushes a new post into the timelines of its owner and owner's audience.
+    Authors with more than TIMELINE_FANOUT_MAX_FOLLOWERS followers are
+    skipped, their posts are merged into feeds on read instead.
+    """
+    limit = settings.TIMELINE_FANOUT_MAX_FOLLOWERS
+    recipient_ids = list(
+        audience_of(post.owner).values_list("id", flat=True)[:limit + 1]
+    )
+    if len(recipient_ids) > limit:
+        merge_on_read(post)
+        recipient_ids = []
+
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=user_id, post=post, created_at=post.created_at
+            )
+            for user_id in [post.owner_id, *recipient_ids]
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def merge_on_read(post: Post) -> None:
+    """
+    Marks the post as not fanned out. The first such post of its owner
+    also merges the owner into the feeds of all followers.
+    """
+    first = not Post.objects.filter(
+        owner_id=post.owner_id, fanned_out=False
+    ).exists()
+    Post.objects.filter(pk=post.pk).update(fanned_out=False)
+    post.fanned_out = False
+    if first:
+        MergedAuthor.objects.bulk_create(
+            [
+                MergedAuthor(user_id=user_id, author_id=post.owner_id)
+                for user_id in audience_of(post.owner)
+                .values_list("id", flat=True)
+                .iterator()
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+
+def backfill_authors(user, authors) -> None:
+    """
+    Copies the latest posts of freshly followed authors into user's timeline
+    and merges authors of posts not fanned out into user's feed.
+    """
+    merged_ids = (
+        Post.objects.filter(owner__in=authors, fanned_out=False)
+        .values_list("owner_id", flat=True)
+        .distinct()
+    )
+    MergedAuthor.objects.bulk_create(
+        [
+            MergedAuthor(user=user, author_id=author_id)
+            for author_id in merged_ids
+        ],
+        ignore_conflicts=True,
+    )
+    posts = (
+        Post.objects.filter(owner__in=authors)
+        .values_list("id", "created_at")[:settings.TIMELINE_BACKFILL_SIZE]
+    )
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user=user, post_id=post_id, created_at=created_at)
+            for post_id, created_at in posts
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def evict_authors(user, authors) -> None:
+    """
+    Removes posts of unfollowed authors from user's timeline.
+    """
+    TimelineEntry.objects.filter(user=user, post__owner__in=authors).delete()
+    MergedAuthor.objects.filter(user=user, author__in=authors).delete()
+
+
+def newest_entries(user):
+    return TimelineEntry.objects.filter(user=user).order_by(
+        "-created_at", "-post_id"
+    )
+
+
+def trim_timelines() -> int:
+    """
+    Deletes timeline entries older than the newest TIMELINE_MAX_ENTRIES
+    of their user, feeds never read them. Returns the number deleted.
+    """
+    limit = settings.TIMELINE_MAX_ENTRIES
+    user_ids = list(
+        TimelineEntry.objects.values("user")
+        .annotate(total=Count("id"))
+        .filter(total__gt=limit)
+        .values_list("user", flat=True)
+    )
+    deleted = 0
+    for user_id in user_ids:
+        entries = newest_entries(user_id).values("created_at", "post_id")
+        last = entries[limit - 1]
+        deleted += TimelineEntry.objects.filter(
+            Q(created_at__lt=last["created_at"])
+            | Q(created_at=last["created_at"], post_id__lt=last["post_id"]),
+            user_id=user_id,
+        ).delete()[0]
+    return deleted
+
+
+def feed_for(
+    user,
+    posts=None,
+    bound: Q | None = None,
+    limit: int | None = None,
+    reverse: bool = False,
+):
+    """
+    Returns queryset with the home feed of the user out of ``posts``
+    (all posts by default): the newest TIMELINE_MAX_ENTRIES materialized
+    timeline entries plus posts not fanned out of merged authors.
+    A page reads only the first ``limit`` merged posts past ``bound``
+    in feed order, or in reverse order for pages before the cursor.
+    """
+    posts = Post.objects.all() if posts is None else posts
+    timeline = newest_entries(user).values("post_id")[
+        :settings.TIMELINE_MAX_ENTRIES
+    ]
+    merged = posts.filter(
+        owner__in=MergedAuthor.objects.filter(user=user).values("author_id"),
+        fanned_out=False,
+    )
+    if bound is not None:
+        merged = merged.filter(bound)
+    ordering = ("created_at", "id") if reverse else ("-created_at", "-id")
+    merged = merged.order_by(*ordering).values("id")[:limit]
+
+    return posts.filter(Q(id__in=timeline) | Q(id__in=merged))
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from social_media.models import HashtagBucket, TrendingHashtag, bucket_start
+
+
+def recompute_trending() -> list[TrendingHashtag]:
+    """
+    Ranks hashtags by their uses in the buckets of the last
+    TRENDING_WINDOW_SECONDS and replaces the TrendingHashtag table.
+    Buckets that left the window are deleted, so the sum only
+    reads window-size / bucket-size rows per hashtag.
+    """
+    now = timezone.now()
+    window_start = bucket_start(
+        now - timedelta(seconds=settings.TRENDING_WINDOW_SECONDS)
+    )
+    top = (
+        HashtagBucket.objects.filter(bucket_start__gte=window_start)
+        .values("hashtag_id")
+        .annotate(total=Sum("count"))
+        .filter(total__gt=0)
+        .order_by("-total", "hashtag_id")[:settings.TRENDING_SIZE]
+    )
+    trending = [
+        TrendingHashtag(
+            hashtag_id=row["hashtag_id"],
+            rank=rank,
+            count=row["total"],
+            computed_at=now,
+        )
+        for rank, row in enumerate(top, start=1)
+    ]
+
+    with transaction.atomic():
+        TrendingHashtag.objects.all().delete()
+        TrendingHashtag.objects.bulk_create(trending)
+        HashtagBucket.objects.filter(bucket_start__lt=window_start).delete()
+
+    return trending
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.functions import Coalesce
+from django_drf_filepond.models import TemporaryUpload
+from PIL import Image, UnidentifiedImageError
+from rest_framework import serializers
+
+from social_media.images import enqueue_image_job
+from social_media.models import Post, PostImage
+
+
+def get_image_upload(upload_id: str, user) -> TemporaryUpload:
+    """
+    Returns finished chunked upload of the user after checking image
+    headers only, the pixel data is not decoded.
+    """
+    try:
+        upload = TemporaryUpload.objects.get(
+            upload_id=upload_id, uploaded_by=user
+        )
+    except TemporaryUpload.DoesNotExist:
+        raise serializers.ValidationError("Upload does not exist.")
+
+    try:
+        with Image.open(upload.get_file_path()) as image:
+            image_format, (width, height) = image.format, image.size
+    except (UnidentifiedImageError, OSError):
+        raise serializers.ValidationError("Upload is not an image.")
+
+    if image_format not in settings.POST_IMAGE_FORMATS:
+        raise serializers.ValidationError(
+            f"Image format {image_format} is not supported."
+        )
+    if width * height > settings.POST_IMAGE_MAX_PIXELS:
+        raise serializers.ValidationError("Image is too large.")
+
+    return upload
+
+
+@transaction.atomic
+def attach_image_upload(post, upload: TemporaryUpload) -> PostImage:
+    """
+    Streams the uploaded file into a new image of the post
+    and removes the temporary upload. The post row is locked,
+    so concurrent attaches take the next positions one by one.
+    """
+    Post.objects.select_for_update().only("pk").get(pk=post.pk)
+    images = PostImage.objects.filter(post=post)
+    if images.count() >= settings.POST_GALLERY_MAX_IMAGES:
+        raise serializers.ValidationError(
+            f"A post can have at most "
+            f"{settings.POST_GALLERY_MAX_IMAGES} images."
+        )
+    position = images.aggregate(
+        next=Coalesce(Max("position") + 1, 0)
+    )["next"]
+    post_image = PostImage(post=post, position=position)
+    with open(upload.get_file_path(), "rb") as file:
+        post_image.image.save(upload.upload_name, File(file))
+    upload.delete()
+
+    enqueue_image_job(post_image)
+    return post_image
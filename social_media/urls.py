@@ -1,13 +1,40 @@
 from django.urls import path
+
+from . import async_views
 from .views import (
+    PostImageAttachView,
     PostListView,
-    PostDetailView
+    PostDetailView,
+    SearchView,
+    TrendingHashtagListView
 )
 
 
 urlpatterns = [
     path("posts/", PostListView.as_view(), name="post-list"),
     path("posts/<int:pk>/", PostDetailView.as_view(), name="post-detail"),
+    path(
+        "posts/<int:pk>/images/",
+        PostImageAttachView.as_view(),
+        name="post-image-attach"
+    ),
+    path(
+        "hashtags/trending/",
+        TrendingHashtagListView.as_view(),
+        name="trending-hashtags"
+    ),
+    path("search/", SearchView.as_view(), name="search"),
+    path("async/posts/", async_views.post_list, name="post-list-async"),
+    path(
+        "async/posts/stream/",
+        async_views.post_stream,
+        name="post-stream"
+    ),
+    path(
+        "async/posts/<int:pk>/",
+        async_views.post_detail,
+        name="post-detail-async"
+    ),
 ]
 
 app_name = "api"
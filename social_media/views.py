@@ -1,43 +1,178 @@
-from django.db.models import Q
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import IsAuthenticated
 
-from social_media.models import Post
+from social_media.caching import CachedRetrieveMixin, ConditionalListMixin
+from social_media.models import (
+    Post,
+    PostHashtag,
+    PostImage,
+    TrendingHashtag,
+)
+from social_media.pagination import PostCursorPagination, SearchPagination
+from social_media.search import POST, PROFILE, SearchResults
+from social_media.streaming import StreamingListMixin
+from social_media.timeline import feed_for
+from user.serializers import ProfileReadSerializer
 from .serializers import (
+    PostImageAttachSerializer,
     PostListSerializer,
-    PostDetailSerializer
+    PostDetailSerializer,
+    PostFeedSerializer,
+    TrendingHashtagSerializer
 )
 
 
-class PostListView(generics.CreateAPIView, generics.ListAPIView):
+def with_post_relations(queryset):
+    """
+    Loads owners and image galleries of every post in two queries,
+    whatever the page size.
+    """
+    return queryset.select_related("owner").prefetch_related(
+        Prefetch(
+            "Images",
+            queryset=PostImage.objects.order_by("position"),
+            to_attr="gallery",
+        )
+    )
+
+
+def filter_by_hashtags(queryset, hashtags: str | None):
+    """
+    Narrows posts to those tagged with any of comma separated ``hashtags``.
+    """
+    if not hashtags:
+        return queryset
+    names = [
+        hashtag.strip().lstrip("#").lower()
+        for hashtag in hashtags.split(",")
+    ]
+    tagged_posts = PostHashtag.objects.filter(
+        hashtag__name__in=names
+    ).values("post_id")
+    return queryset.filter(id__in=tagged_posts)
+
+
+@extend_schema_view(get=extend_schema(responses=PostListSerializer))
+class PostListView(
+    StreamingListMixin,
+    ConditionalListMixin,
+    generics.CreateAPIView,
+    generics.ListAPIView,
+):
     """
     API endpoint that allows posts to be listed.
     """
     queryset = Post.objects.all()
     serializer_class = PostListSerializer
+    pagination_class = PostCursorPagination
+    version_fields = ("updated_at", "owner__updated_at")
+
+    def get_serializer_class(self):
+        if self.request.method == "GET":
+            return PostFeedSerializer
+        return PostListSerializer
 
     def get_queryset(self):
-        followed_users_ids = (
-            self.request.user.followers.all()
+        posts = filter_by_hashtags(
+            Post.objects.all(), self.request.query_params.get("hashtags")
+        )
+        window = (
+            {}
+            if self.should_stream(self.request)
+            else self.paginator.get_feed_window(self.request)
+        )
+        return with_post_relations(
+            feed_for(self.request.user, posts, **window)
         )
-        user_profile_id = self.request.user.id
 
-        queryset = self.queryset.filter(
-            owner__in=list(followed_users_ids) + [user_profile_id]
+
+class PostDetailView(CachedRetrieveMixin, generics.RetrieveUpdateAPIView):
+    """
+    API endpoint that allows a post to be retrieved.
+    """
+    cache_prefix = "post"
+    queryset = with_post_relations(Post.objects.all())
+    serializer_class = PostDetailSerializer
+
+
+class PostImageAttachView(generics.CreateAPIView):
+    """
+    API endpoint that attaches a finished chunked upload to a post.
+    """
+    serializer_class = PostImageAttachSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["post"] = get_object_or_404(
+            Post, pk=self.kwargs["pk"], owner=self.request.user
         )
+        return context
 
-        hashtags = self.request.query_params.get("hashtags")
-        if hashtags:
-            query = Q()
-            for hashtag in hashtags.split(','):
-                query |= Q(message__icontains=f"#{hashtag}")
-            queryset = queryset.filter(query)
 
-        return queryset.distinct()
+class TrendingHashtagListView(generics.ListAPIView):
+    """
+    API endpoint that lists hashtags trending over the last
+    TRENDING_WINDOW_SECONDS, as last ranked by recompute_trending.
+    """
+    queryset = TrendingHashtag.objects.select_related("hashtag")
+    serializer_class = TrendingHashtagSerializer
+    pagination_class = None
 
 
-class PostDetailView(generics.RetrieveUpdateAPIView):
+class SearchView(generics.ListAPIView):
     """
-    API endpoint that allows a post to be retrieved.
+    API endpoint that searches posts and profiles by words of ``q``,
+    best matches first. ``type`` narrows results to posts or profiles.
     """
-    queryset = Post.objects.all()
-    serializer_class = PostDetailSerializer
+    pagination_class = SearchPagination
+    permission_classes = [IsAuthenticated]
+    serializer_class = PostListSerializer
+    result_sources = {
+        POST: (
+            lambda: with_post_relations(Post.objects.all()),
+            PostFeedSerializer,
+        ),
+        PROFILE: (
+            lambda: get_user_model().objects.all(),
+            ProfileReadSerializer,
+        ),
+    }
+
+    def get_queryset(self):
+        kind = self.request.query_params.get("type") or None
+        if kind is not None and kind not in self.result_sources:
+            raise ValidationError(
+                {"type": f"Choose one of: {', '.join(self.result_sources)}."}
+            )
+        return SearchResults(self.request.query_params.get("q", ""), kind)
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        context = self.get_serializer_context()
+
+        found = {}
+        for kind, (queryset, serializer_class) in self.result_sources.items():
+            ids = [object_id for hit, object_id, _ in page if hit == kind]
+            if ids:
+                found[kind] = {
+                    item.id: serializer_class(item, context=context).data
+                    for item in queryset().filter(id__in=ids)
+                }
+
+        results = [
+            {
+                "type": kind,
+                "id": object_id,
+                "rank": rank,
+                "object": found[kind][object_id],
+            }
+            for kind, object_id, rank in page
+            if object_id in found.get(kind, {})
+        ]
+        return self.get_paginated_response(results)
@@ -0,0 +1,29 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend for local runs with concurrent readers: WAL lets reads
+    go on while one connection writes, busy_timeout makes writers wait for
+    the lock instead of failing with "database is locked".
+    Pragmas can be overridden with the ``PRAGMAS`` key of OPTIONS.
+    """
+
+    pragmas = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -20000,
+        "temp_store": "MEMORY",
+    }
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**self.pragmas, **params.pop("PRAGMAS", {})}
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for pragma, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        return conn
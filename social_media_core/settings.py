@@ -82,12 +82,59 @@ WSGI_APPLICATION = "social_media_core.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# PostgreSQL is used when POSTGRES_DB is set, SQLite in WAL mode otherwise.
+if os.getenv("POSTGRES_DB"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("POSTGRES_DB"),
+            "USER": os.getenv("POSTGRES_USER", ""),
+            "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
+            "HOST": os.getenv("POSTGRES_HOST", ""),
+            "PORT": os.getenv("POSTGRES_PORT", ""),
+        }
     }
-}
+    # PgBouncer in transaction pooling mode can hand every transaction
+    # to another server connection, named cursors would get lost.
+    if os.getenv("POSTGRES_PGBOUNCER", "").lower() in ("1", "true", "yes"):
+        DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "social_media_core.db.backends.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+        }
+    }
+
+# Seconds a connection is kept open between requests, 0 closes it
+# after every request. Broken connections are replaced on reuse.
+DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", 60))
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Seconds an authenticated user stays cached between JWT requests.
+AUTH_USER_CACHE_TTL = 60
+# Seconds serialized post and profile details stay cached.
+RESPONSE_CACHE_TTL = 300
 
 
 # Password validation
@@ -129,6 +176,16 @@ STATIC_URL = "static/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = "/media/"
 
+# Uploads are deduplicated by content, see social_media.storage.
+STORAGES = {
+    "default": {
+        "BACKEND": "social_media.storage.ContentAddressedFileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -143,6 +200,43 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
 }
 
+# Authors with more followers than this are not fanned out on write,
+# their posts are merged into the feed on read.
+TIMELINE_FANOUT_MAX_FOLLOWERS = 5000
+# How many latest posts of a newly followed author go into the timeline.
+TIMELINE_BACKFILL_SIZE = 500
+# Newest timeline entries a feed is read from, trim_timelines deletes
+# the older ones.
+TIMELINE_MAX_ENTRIES = 1000
+
+# Longest side in pixels of every image rendition made by process_image_jobs.
+IMAGE_RENDITIONS = {"thumbnail": 150, "feed": 640, "full": 1600}
+# Pillow format of renditions, WEBP or JPEG.
+IMAGE_RENDITION_FORMAT = "WEBP"
+IMAGE_JOB_MAX_ATTEMPTS = 3
+# Seconds after which a job claimed by a worker that died is claimed again.
+IMAGE_JOB_LEASE_SECONDS = 600
+
+# Rows read and sent per chunk by ?stream=1 list responses.
+STREAMING_CHUNK_SIZE = 500
+
+# Broker of live feed streams, the in-memory one reaches only streams
+# served by the same process.
+REALTIME_BROKER = (
+    "social_media.realtime.RedisBroker"
+    if REDIS_URL
+    else "social_media.realtime.InMemoryBroker"
+)
+# Seconds between keep-alive comments on idle streams.
+REALTIME_HEARTBEAT_SECONDS = 15
+# Seconds after which a stream is closed for the client to reconnect.
+REALTIME_STREAM_SECONDS = 300
+
+# Hashtag uses are counted per bucket, trending ranks the sum over the window.
+TRENDING_BUCKET_SECONDS = 300
+TRENDING_WINDOW_SECONDS = 24 * 60 * 60
+TRENDING_SIZE = 20
+
 DJANGO_DRF_FILEPOND_FILE_STORE_PATH = os.path.join(
     BASE_DIR, "filepond-eternal-uploads"
 )
@@ -151,10 +245,28 @@ DJANGO_DRF_FILEPOND_UPLOAD_TMP = os.path.join(
     BASE_DIR, "filepond-temp-uploads"
 )
 
+DJANGO_DRF_FILEPOND_PERMISSION_CLASSES = {
+    endpoint: ["rest_framework.permissions.IsAuthenticated"]
+    for endpoint in (
+        "POST_PROCESS",
+        "PATCH_PATCH",
+        "DELETE_REVERT",
+        "GET_LOAD",
+        "GET_RESTORE",
+        "GET_FETCH",
+    )
+}
+
+POST_GALLERY_MAX_IMAGES = 10
+
+# Chunked uploads are checked by their headers only before attaching.
+POST_IMAGE_FORMATS = ("JPEG", "PNG", "GIF", "WEBP")
+POST_IMAGE_MAX_PIXELS = 40_000_000
+
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
 }
 
@@ -30,6 +30,10 @@ urlpatterns = [
         "users/",
         include("user.urls", namespace="users")
     ),
+    path(
+        "api/uploads/",
+        include("django_drf_filepond.urls")
+    ),
     path(
         "api/schema/",
         SpectacularAPIView.as_view(),
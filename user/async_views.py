@@ -0,0 +1,85 @@
+"""
+Coroutine versions of the profile list and follow endpoints for ASGI servers.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+
+from social_media.images import stored_rendition_url
+from social_media.links import url_builder
+from user.authentication import async_api_view
+from user.serializers import change_follow
+
+PROFILE_FIELDS = (
+    "id",
+    "email",
+    "followers_count",
+    "following_count",
+    "first_name",
+    "last_name",
+    "bio",
+)
+
+
+@async_api_view("GET")
+async def profile_list(request):
+    User = get_user_model()
+    storage = User._meta.get_field("image").storage
+    urls = url_builder(request)
+    profiles = []
+
+    rows = User.objects.values(*PROFILE_FIELDS, "image", "image_renditions")
+    async for row in rows.aiterator():
+        image = stored_rendition_url(
+            storage, row.pop("image"), row.pop("image_renditions"), "thumbnail"
+        )
+        row["image"] = urls.absolute(image)
+        row["profile_detail_link"] = urls.reverse(
+            "users:profile_detail", row["id"]
+        )
+        profiles.append(row)
+
+    return JsonResponse(profiles, safe=False)
+
+
+@async_api_view("POST", "PUT", "DELETE")
+async def follow(request, pk):
+    """
+    POST toggles following of the user, PUT follows and DELETE unfollows.
+    The follow edge, counters and timeline change in one transaction,
+    which the async ORM can not open, so only that step runs in a thread.
+    """
+    User = get_user_model()
+    if pk == request.user.id:
+        raise ValidationError("You can not follow yourself.")
+
+    action = {"POST": "toggle", "PUT": "follow", "DELETE": "unfollow"}
+    if request.method == "POST":
+        try:
+            followed_user = await User.objects.aget(pk=pk)
+        except User.DoesNotExist:
+            raise NotFound()
+    else:
+        followed_user = User(pk=pk)
+
+    changed = await sync_to_async(change_follow)(
+        request.user, followed_user, action[request.method]
+    )
+    if request.method == "DELETE":
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+    if (
+        request.method == "PUT"
+        and changed is None
+        and not await User.objects.filter(pk=pk).aexists()
+    ):
+        raise NotFound()
+
+    return JsonResponse(
+        {
+            "followed": pk,
+            "following": request.user.id,
+            "url": url_builder(request).reverse("users:profile_detail", pk),
+        }
+    )
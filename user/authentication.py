@@ -0,0 +1,118 @@
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.http import JsonResponse
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import (
+    APIException,
+    MethodNotAllowed,
+    NotAuthenticated,
+)
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+
+def user_cache_key(user_id) -> str:
+    return f"auth-user:{user_id}"
+
+
+def invalidate_cached_user(user_id) -> None:
+    cache.delete(user_cache_key(user_id))
+
+
+def invalidate_cached_users(user_ids) -> None:
+    """
+    Drops cached users now and again once the transaction commits,
+    so a request racing the transaction can not cache the old rows.
+    """
+    keys = [user_cache_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that keeps resolved users in the cache for
+    AUTH_USER_CACHE_TTL seconds instead of selecting them on every request.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.AUTH_USER_CACHE_TTL)
+        elif not user.is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+
+        return user
+
+
+async def aauthenticate(request):
+    """
+    Async counterpart of CachedJWTAuthentication for plain coroutine views,
+    returns the user of the bearer token or raises NotAuthenticated.
+    """
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        raise NotAuthenticated()
+
+    validated_token = authentication.get_validated_token(raw_token)
+    user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+    key = user_cache_key(user_id)
+    user = await cache.aget(key)
+    if user is None:
+        try:
+            user = await get_user_model().objects.aget(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except get_user_model().DoesNotExist:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            )
+        await cache.aset(key, user, settings.AUTH_USER_CACHE_TTL)
+    if not user.is_active:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+    return user
+
+
+def async_api_view(*methods):
+    """
+    Wraps a coroutine view: allows only ``methods``, sets ``request.user``
+    from the JWT and renders DRF API exceptions as JSON errors.
+    Like DRF views, token authenticated views are exempt from CSRF.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                if request.method not in methods:
+                    raise MethodNotAllowed(request.method)
+                request.user = await aauthenticate(request)
+                return await view(request, *args, **kwargs)
+            except APIException as error:
+                detail = error.detail
+                if not isinstance(detail, (list, dict)):
+                    detail = {"detail": detail}
+                return JsonResponse(
+                    detail, status=error.status_code, safe=False
+                )
+
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired outstanding tokens and their blacklist entries "
+        "in batches, meant to be run periodically"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of tokens deleted per transaction",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        expired = OutstandingToken.objects.filter(
+            expires_at__lt=timezone.now()
+        ).order_by("id").values_list("id", flat=True)
+        pruned = 0
+
+        while True:
+            token_ids = list(expired[:batch_size])
+            if not token_ids:
+                break
+            with transaction.atomic():
+                BlacklistedToken.objects.filter(token_id__in=token_ids).delete()
+                OutstandingToken.objects.filter(id__in=token_ids).delete()
+            pruned += len(token_ids)
+
+        self.stdout.write(self.style.SUCCESS(f"Pruned {pruned} tokens"))
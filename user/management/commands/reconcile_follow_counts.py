@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from user.models import Follow
+
+
+def count_edges(field: str):
+    """
+    Correlated subquery counting Follow rows where ``field`` is the user.
+    """
+    return Coalesce(
+        Subquery(
+            Follow.objects.filter(**{field: OuterRef("pk")})
+            .values(field)
+            .annotate(total=Count("*"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = "Recomputes drifted followers_count/following_count counters"
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.annotate(
+            actual_followers=count_edges("followee"),
+            actual_following=count_edges("follower"),
+        )
+        drifted = users.filter(
+            ~Q(followers_count=F("actual_followers"))
+            | ~Q(following_count=F("actual_following"))
+        )
+
+        fixed = drifted.update(
+            followers_count=count_edges("followee"),
+            following_count=count_edges("follower"),
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Fixed {fixed} users"))
@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-18 07:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_follow_counters(apps, schema_editor):
+    User = apps.get_model("user", "User")
+
+    def count_edges(through):
+        return Coalesce(
+            Subquery(
+                through.objects.filter(from_user=OuterRef("pk"))
+                .values("from_user")
+                .annotate(total=Count("*"))
+                .values("total")
+            ),
+            0,
+        )
+
+    User.objects.update(
+        followers_count=count_edges(User.followers.through),
+        following_count=count_edges(User.following.through),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0003_remove_user_follow_user_followers_user_following_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="followers_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="following_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_follow_counters, migrations.RunPython.noop),
+    ]
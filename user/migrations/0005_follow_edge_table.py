@@ -0,0 +1,124 @@
+# Generated by Django 4.2 on 2026-10-18 07:08
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def copy_follow_edges(apps, schema_editor):
+    """
+    Both old tables were written by the follow endpoint for "A follows B"
+    as ``A.followers -> B`` and ``B.following -> A``.
+    """
+    User = apps.get_model("user", "User")
+    Follow = apps.get_model("user", "Follow")
+
+    edges = set(
+        User.followers.through.objects.values_list("from_user", "to_user")
+    )
+    edges.update(
+        User.following.through.objects.values_list("to_user", "from_user")
+    )
+    Follow.objects.bulk_create(
+        [
+            Follow(follower_id=follower, followee_id=followee)
+            for follower, followee in edges
+            if follower != followee
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def recount_follow_counters(apps, schema_editor):
+    User = apps.get_model("user", "User")
+    Follow = apps.get_model("user", "Follow")
+
+    def count_edges(field):
+        return Coalesce(
+            Subquery(
+                Follow.objects.filter(**{field: OuterRef("pk")})
+                .values(field)
+                .annotate(total=Count("*"))
+                .values("total")
+            ),
+            0,
+        )
+
+    User.objects.update(
+        followers_count=count_edges("followee"),
+        following_count=count_edges("follower"),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0004_follow_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Follow",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "followee",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="follower_edges",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "follower",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="following_edges",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="follow",
+            index=models.Index(
+                fields=["followee", "follower"], name="follow_followee_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="follow",
+            constraint=models.UniqueConstraint(
+                fields=("follower", "followee"), name="unique_follow"
+            ),
+        ),
+        migrations.RunPython(copy_follow_edges, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="user",
+            name="followers",
+        ),
+        migrations.RemoveField(
+            model_name="user",
+            name="following",
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="following",
+            field=models.ManyToManyField(
+                related_name="followers",
+                through="user.Follow",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(recount_follow_counters, migrations.RunPython.noop),
+    ]
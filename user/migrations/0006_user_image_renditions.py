@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0005_follow_edge_table"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="image_renditions",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -4,10 +4,14 @@ import uuid
 from django.contrib.auth import get_user_model
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
-from django.db import models, transaction
+from django.db import connections, models, transaction
+from django.db.models import F
+from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.translation import gettext as _
 
+from user.authentication import invalidate_cached_users
+
 
 class UserManager(BaseUserManager):
     """Define a model manager for User model with no username field."""
@@ -57,14 +61,15 @@ class User(AbstractUser):
     following = models.ManyToManyField(
         "self",
         symmetrical=False,
-        related_name="user_followers",
-    )
-    followers = models.ManyToManyField(
-        "self",
-        symmetrical=False,
-        related_name="user_following",
+        through="Follow",
+        through_fields=("follower", "followee"),
+        related_name="followers",
     )
     image = models.ImageField(null=True, upload_to=profile_image_file_path)
+    image_renditions = models.JSONField(default=dict, blank=True)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
@@ -77,26 +82,208 @@ class User(AbstractUser):
     def __str__(self) -> str:
         return self.email
 
-    @property
-    def followers_count(self) -> int:
-        return self.followers.count()
-
     @transaction.atomic
     def follow_unfollow_user(self, user):
         """
-        Unfollow the specified user.
+        Follow the specified user or unfollow if already followed.
+        Returns True if the user is followed now, False if unfollowed
+        and None if user is self.
         """
-        print(self, user)
         if self != user:
-            if self.is_following(user):
-                self.following.remove(user)
-                user.followers.remove(self)
-            else:
-                self.following.add(user)
-                user.followers.add(self)
+            if self.unfollow(user):
+                return False
+            self.follow(user)
+            return True
+
+    @transaction.atomic
+    def follow(self, user) -> bool:
+        """
+        Follow the specified user, returns True if the edge was created.
+        """
+        created = Follow.objects.create_if_missing(self, user)
+        if created:
+            self._update_follow_counts(user, 1)
+        return created
+
+    @transaction.atomic
+    def unfollow(self, user) -> bool:
+        """
+        Unfollow the specified user, returns True if the edge was removed.
+        """
+        deleted, _ = Follow.objects.filter(
+            follower=self, followee=user
+        ).delete()
+        if deleted:
+            self._update_follow_counts(user, -1)
+        return bool(deleted)
+
+    @transaction.atomic
+    def follow_many(self, user_ids) -> tuple[list[int], list[int]]:
+        """
+        Follow existing users from user_ids in bulk, returns ids of the
+        newly followed users and ids of the users already followed.
+        """
+        new_ids = sorted(Follow.objects.create_missing(self, user_ids))
+        followed = (
+            Follow.objects.filter(follower=self, followee_id__in=user_ids)
+            .exclude(followee_id__in=new_ids)
+            .values_list("followee_id", flat=True)
+        )
+        self._update_bulk_follow_counts(new_ids, 1)
+        return new_ids, sorted(followed)
+
+    @transaction.atomic
+    def unfollow_many(self, user_ids) -> list[int]:
+        """
+        Unfollow users from user_ids in bulk,
+        returns ids of the users unfollowed.
+        """
+        edges = Follow.objects.filter(follower=self, followee_id__in=user_ids)
+        removed_ids = sorted(
+            edges.select_for_update().values_list("followee_id", flat=True)
+        )
+
+        edges.filter(followee_id__in=removed_ids).delete()
+        self._update_bulk_follow_counts(removed_ids, -1)
+        return removed_ids
 
     def is_following(self, user):
         """
         Check if the user is following the specified user.
         """
-        return self.following.filter(id=user.id).exists()
+        return Follow.objects.filter(follower=self, followee=user).exists()
+
+    def _update_follow_counts(self, user, delta: int) -> None:
+        """
+        Shifts the denormalized counters of both sides of a follow edge.
+        """
+        now = timezone.now()
+        User.objects.filter(pk=self.pk).update(
+            following_count=F("following_count") + delta, updated_at=now
+        )
+        User.objects.filter(pk=user.pk).update(
+            followers_count=F("followers_count") + delta, updated_at=now
+        )
+        invalidate_cached_users([self.pk, user.pk])
+
+    def _update_bulk_follow_counts(self, user_ids, delta: int) -> None:
+        if not user_ids:
+            return
+        now = timezone.now()
+        User.objects.filter(pk=self.pk).update(
+            following_count=F("following_count") + delta * len(user_ids),
+            updated_at=now,
+        )
+        User.objects.filter(pk__in=user_ids).update(
+            followers_count=F("followers_count") + delta, updated_at=now
+        )
+        invalidate_cached_users([self.pk, *user_ids])
+
+
+class FollowManager(models.Manager):
+    def create_if_missing(self, follower, followee) -> bool:
+        """
+        Inserts the edge with a single ``INSERT ... ON CONFLICT DO NOTHING``,
+        skipped when followee does not exist.
+        Returns True if a row was inserted.
+        """
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        opts = self.model._meta
+        created_at = opts.get_field("created_at")
+        columns = ", ".join(
+            quote(opts.get_field(name).column)
+            for name in ("follower", "followee", "created_at")
+        )
+        sql = (
+            f"INSERT INTO {quote(opts.db_table)} ({columns}) "
+            f"SELECT %s, %s, %s WHERE EXISTS ("
+            f"SELECT 1 FROM {quote(User._meta.db_table)} "
+            f"WHERE {quote(User._meta.pk.column)} = %s"
+            f") ON CONFLICT DO NOTHING"
+        )
+        params = [
+            follower.pk,
+            followee.pk,
+            created_at.get_db_prep_value(timezone.now(), connection),
+            followee.pk,
+        ]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount == 1
+
+    def create_missing(self, follower, followee_ids) -> list[int]:
+        """
+        Inserts edges to the existing users of ``followee_ids`` other than
+        follower in one ``INSERT ... ON CONFLICT DO NOTHING RETURNING``.
+        Returns ids of the followees whose edge this call created, rows
+        inserted meanwhile by concurrent requests are not among them.
+        """
+        followee_ids = list(followee_ids)
+        if not followee_ids:
+            return []
+
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        opts = self.model._meta
+        created_at = opts.get_field("created_at")
+        followee_column = quote(opts.get_field("followee").column)
+        columns = ", ".join(
+            quote(opts.get_field(name).column)
+            for name in ("follower", "followee", "created_at")
+        )
+        user_pk = quote(User._meta.pk.column)
+        placeholders = ", ".join(["%s"] * len(followee_ids))
+        sql = (
+            f"INSERT INTO {quote(opts.db_table)} ({columns}) "
+            f"SELECT %s, {user_pk}, %s FROM {quote(User._meta.db_table)} "
+            f"WHERE {user_pk} IN ({placeholders}) AND {user_pk} <> %s "
+            f"ON CONFLICT DO NOTHING RETURNING {followee_column}"
+        )
+        params = [
+            follower.pk,
+            created_at.get_db_prep_value(timezone.now(), connection),
+            *followee_ids,
+            follower.pk,
+        ]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+class Follow(models.Model):
+    """
+    Follow edge: ``follower`` sees posts of ``followee`` in the feed.
+    """
+    follower = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="following_edges"
+    )
+    followee = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="follower_edges"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = FollowManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["follower", "followee"],
+                name="unique_follow"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["followee", "follower"],
+                name="follow_followee_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.follower} -> {self.followee}"
@@ -1,6 +1,18 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework import serializers
 
+from social_media.caching import invalidate_responses
+from social_media.images import (
+    clear_renditions,
+    enqueue_image_job,
+    rendition_url,
+)
+from social_media.links import url_builder
+from social_media.serializers import DetailLinkField, RenditionImageField
+from social_media.storage import release_names
+from social_media.timeline import backfill_authors, evict_authors
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,25 +28,33 @@ class UserSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         """Create a new user with encrypted password and return it"""
-        return get_user_model().objects.create_user(**validated_data)
+        user = get_user_model().objects.create_user(**validated_data)
+        enqueue_image_job(user)
+        return user
 
     def update(self, instance, validated_data):
         """Update a user, set the password correctly and return it"""
         password = validated_data.pop("password", None)
+        old_image = instance.image.name if instance.image else None
         user = super().update(instance, validated_data)
         if password:
             user.set_password(password)
             user.save()
+        if "image" in validated_data:
+            release_names(user.image.storage, [old_image])
+            if user.image:
+                enqueue_image_job(user)
+            else:
+                clear_renditions(user)
 
         return user
 
 
 class ProfileListSerializer(UserSerializer):
-    profile_detail_link = serializers.HyperlinkedIdentityField(
-        view_name="users:profile_update",
-        lookup_field="pk"
+    profile_detail_link = DetailLinkField("users:profile_detail")
+    image = RenditionImageField(
+        rendition="thumbnail", required=False, allow_null=True
     )
-    followers_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = get_user_model()
@@ -42,16 +62,47 @@ class ProfileListSerializer(UserSerializer):
             "id",
             "email",
             "followers_count",
+            "following_count",
             "first_name",
             "last_name",
             "bio",
             "image",
             "profile_detail_link",
         )
+        read_only_fields = ("followers_count", "following_count")
+
+
+class ProfileReadSerializer(serializers.BaseSerializer):
+    """
+    Read-only fast path of ProfileListSerializer for list responses.
+    """
+    image_rendition = "thumbnail"
+
+    def to_representation(self, instance):
+        urls = url_builder(self.context["request"])
+        image = rendition_url(
+            instance.image, instance.image_renditions, self.image_rendition
+        )
+        return {
+            "id": instance.id,
+            "email": instance.email,
+            "followers_count": instance.followers_count,
+            "following_count": instance.following_count,
+            "first_name": instance.first_name,
+            "last_name": instance.last_name,
+            "bio": instance.bio,
+            "image": urls.absolute(image),
+            "profile_detail_link": urls.reverse(
+                "users:profile_detail", instance.id
+            ),
+        }
 
 
 class ProfileDetailUpdateDeleteSerializer(UserSerializer):
     password = serializers.CharField(write_only=True, required=False)
+    image = RenditionImageField(
+        rendition="full", required=False, allow_null=True
+    )
 
     class Meta(UserSerializer.Meta):
         fields = (UserSerializer.Meta.fields + (
@@ -82,12 +133,84 @@ class ProfileDetailUpdateDeleteSerializer(UserSerializer):
         return user
 
 
+@transaction.atomic
+def change_follow(following_user, followed_user, action: str = "toggle"):
+    """
+    Applies ``action`` ("toggle", "follow" or "unfollow") to the follow
+    edge and the timeline of ``following_user``. Returns True if the
+    edge was created, False if removed and None if nothing changed.
+    """
+    if action == "follow":
+        followed = True if following_user.follow(followed_user) else None
+    elif action == "unfollow":
+        followed = False if following_user.unfollow(followed_user) else None
+    else:
+        followed = following_user.follow_unfollow_user(followed_user)
+
+    if followed:
+        backfill_authors(following_user, [followed_user])
+    elif followed is False:
+        evict_authors(following_user, [followed_user])
+    if followed is not None:
+        invalidate_responses("profile", [following_user.pk, followed_user.pk])
+
+    return followed
+
+
 class FollowUnfollowSerializer(serializers.Serializer):
+    """
+    Changes the follow edge from request user to ``followed_user``.
+    ``action`` in context is one of "toggle" (default), "follow" or
+    "unfollow"; ``changed`` tells if an edge was created or removed.
+    """
+
     def save(self, **kwargs):
         request = self.context.get("request")
         followed_user = self.context.get("followed_user")
-        following_user = request.user
+        followed = change_follow(
+            request.user, followed_user, self.context.get("action", "toggle")
+        )
+        self.changed = followed is not None
+        return followed_user
 
-        followed_user.follow_unfollow_user(following_user)
 
-        return followed_user
+class BulkFollowSerializer(serializers.Serializer):
+    """
+    Follows (or unfollows with ``action="unfollow"`` in context)
+    a list of users and reports the outcome per id.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=500,
+    )
+
+    @transaction.atomic
+    def save(self, **kwargs):
+        user = self.context["request"].user
+        ids = list(dict.fromkeys(self.validated_data["ids"]))
+
+        if self.context.get("action") == "unfollow":
+            removed = set(user.unfollow_many(ids))
+            evict_authors(user, removed)
+            results = {
+                pk: "unfollowed" if pk in removed else "not_following"
+                for pk in ids
+            }
+        else:
+            created, followed = map(set, user.follow_many(ids))
+            backfill_authors(user, created)
+            results = {
+                pk: "followed" if pk in created
+                else "already_following" if pk in followed
+                else "self" if pk == user.pk
+                else "not_found"
+                for pk in ids
+            }
+
+        changed = [
+            pk for pk, result in results.items()
+            if result in ("followed", "unfollowed")
+        ]
+        invalidate_responses("profile", [user.pk, *changed])
+        return [{"id": pk, "status": result} for pk, result in results.items()]
@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from social_media.caching import invalidate_responses
+from social_media.search import (
+    PROFILE,
+    index_documents,
+    profile_document,
+    remove_documents,
+)
+from social_media.storage import release_names
+from user.authentication import invalidate_cached_user, invalidate_cached_users
+from user.models import Follow
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+    invalidate_responses("profile", [instance.pk])
+
+
+@receiver(post_save, sender=get_user_model())
+def drop_cached_posts_of_owner(
+    sender, instance, created, update_fields=None, **kwargs
+):
+    """
+    Cached post details embed the owner's email.
+    """
+    if created or not (update_fields is None or "email" in update_fields):
+        return
+    invalidate_responses("post", instance.posts.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=get_user_model())
+def release_follow_counters(sender, instance, **kwargs):
+    """
+    Takes the follow edges cascading away with the user
+    off the counters of the users on their other side.
+    """
+    followee_ids = list(
+        Follow.objects.filter(follower=instance).values_list(
+            "followee_id", flat=True
+        )
+    )
+    follower_ids = list(
+        Follow.objects.filter(followee=instance).values_list(
+            "follower_id", flat=True
+        )
+    )
+    now = timezone.now()
+    if followee_ids:
+        sender.objects.filter(pk__in=followee_ids).update(
+            followers_count=F("followers_count") - 1, updated_at=now
+        )
+    if follower_ids:
+        sender.objects.filter(pk__in=follower_ids).update(
+            following_count=F("following_count") - 1, updated_at=now
+        )
+    changed = [*followee_ids, *follower_ids]
+    invalidate_cached_users(changed)
+    invalidate_responses("profile", changed)
+
+
+@receiver(post_delete, sender=get_user_model())
+def release_profile_image(sender, instance, **kwargs):
+    if instance.image:
+        release_names(
+            instance.image.storage,
+            [instance.image.name, *instance.image_renditions.values()],
+        )
+
+
+PROFILE_DOCUMENT_FIELDS = {"email", "first_name", "last_name", "bio"}
+
+
+@receiver(post_save, sender=get_user_model())
+def index_profile(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or PROFILE_DOCUMENT_FIELDS & set(update_fields):
+        index_documents(PROFILE, {instance.pk: profile_document(instance)})
+
+
+@receiver(post_delete, sender=get_user_model())
+def unindex_profile(sender, instance, **kwargs):
+    remove_documents(PROFILE, [instance.pk])
@@ -1,3 +1,341 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from social_media.models import MediaBlob
+from user.models import Follow
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+class FollowCounterTests(TestCase):
+    """
+    Follow counters stay equal to the Follow rows, also for requests
+    authenticated with a cached user.
+    """
+
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user("me@test.com", "password123")
+        self.other = User.objects.create_user("other@test.com", "password123")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def assertCounts(self, following, followers):
+        self.user.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.user.following_count, following)
+        self.assertEqual(self.other.followers_count, followers)
+        self.assertEqual(self.user.following.count(), following)
+
+    def follow_url(self, user):
+        return reverse("users:follow", args=[user.id])
+
+    def test_updating_me_keeps_follow_counters(self):
+        self.client.get(reverse("users:manage"))
+        self.client.put(self.follow_url(self.other))
+
+        response = self.client.patch(
+            reverse("users:manage"), {"email": "new@test.com"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertCounts(following=1, followers=1)
+
+        response = self.client.delete(self.follow_url(self.other))
+        self.assertEqual(response.status_code, 204)
+        self.assertCounts(following=0, followers=0)
+
+    def test_deleting_user_releases_their_follow_counters(self):
+        User = get_user_model()
+        dave = User.objects.create_user("dave@test.com", "password123")
+        dave.follow(self.user)
+        dave.follow(self.other)
+        self.user.follow(dave)
+
+        dave.delete()
+
+        self.user.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(
+            (self.user.followers_count, self.user.following_count), (0, 0)
+        )
+        self.assertEqual(self.other.followers_count, 0)
+        self.assertEqual(self.other.followers.count(), 0)
+
+
+class BulkFollowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user("me@test.com", "password123")
+        self.others = [
+            User.objects.create_user(f"user{index}@test.com", "password123")
+            for index in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("users:bulk_follow")
+
+    def statuses(self, response):
+        return {
+            item["id"]: item["status"] for item in response.data["results"]
+        }
+
+    def test_follow_and_unfollow_in_bulk(self):
+        first, second, third = self.others
+        response = self.client.post(
+            self.url,
+            {"ids": [first.id, second.id, self.user.id, 999]},
+            format="json",
+        )
+
+        self.assertEqual(
+            self.statuses(response),
+            {
+                first.id: "followed",
+                second.id: "followed",
+                self.user.id: "self",
+                999: "not_found",
+            },
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.following_count, 2)
+
+        response = self.client.post(
+            self.url, {"ids": [first.id, third.id]}, format="json"
+        )
+        self.assertEqual(
+            self.statuses(response),
+            {first.id: "already_following", third.id: "followed"},
+        )
+
+        response = self.client.delete(
+            self.url, {"ids": [first.id, 999]}, format="json"
+        )
+        self.assertEqual(
+            self.statuses(response),
+            {first.id: "unfollowed", 999: "not_following"},
+        )
+
+        counts = get_user_model().objects.order_by("id").values_list(
+            "following_count", "followers_count"
+        )
+        self.assertEqual(list(counts), [(2, 0), (0, 0), (0, 1), (0, 1)])
+
+    def test_edges_inserted_meanwhile_are_not_counted(self):
+        first, second, _ = self.others
+        # An edge another request inserted after this one checked.
+        Follow.objects.create(follower=self.user, followee=first)
+
+        new_ids, followed = self.user.follow_many([first.id, second.id])
+
+        self.assertEqual((new_ids, followed), ([second.id], [first.id]))
+        first.refresh_from_db()
+        self.assertEqual(first.followers_count, 0)
+
+
+class FollowEdgeTests(TestCase):
+    """
+    One Follow row per "follower follows followee", read from both sides.
+    """
+
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user("me@test.com", "password123")
+        self.other = User.objects.create_user("other@test.com", "password123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_follow_edge_points_from_follower_to_followee(self):
+        self.client.post(reverse("users:follow", args=[self.other.id]))
+
+        edge = Follow.objects.get()
+        self.assertEqual(
+            (edge.follower, edge.followee), (self.user, self.other)
+        )
+        self.assertEqual(list(self.user.following.all()), [self.other])
+        self.assertEqual(list(self.other.followers.all()), [self.user])
+        self.assertFalse(self.user.followers.exists())
+        self.assertFalse(self.other.following.exists())
+
+    def test_post_toggles_follow(self):
+        url = reverse("users:follow", args=[self.other.id])
+        self.client.post(url)
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Follow.objects.exists())
+
+
+class FollowEdgeMigrationTests(TransactionTestCase):
+    """
+    0005 merges both old follow tables into Follow rows and recounts.
+    """
+
+    migrate_from = [("user", "0004_follow_counters")]
+    migrate_to = [("user", "0005_follow_edge_table")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_old_edges_become_follower_to_followee_rows(self):
+        User = self.migrate(self.migrate_from).get_model("user", "User")
+        first, second, third = [
+            User.objects.create(email=f"user{index}@test.com")
+            for index in range(3)
+        ]
+        # "first follows second" written to both old tables.
+        first.followers.add(second)
+        second.following.add(first)
+        # "third follows first" only in one of them.
+        first.following.add(third)
+
+        apps = self.migrate(self.migrate_to)
+        Follow = apps.get_model("user", "Follow")
+        User = apps.get_model("user", "User")
+
+        self.assertEqual(
+            set(Follow.objects.values_list("follower", "followee")),
+            {(first.id, second.id), (third.id, first.id)},
+        )
+        counts = User.objects.order_by("id").values_list(
+            "following_count", "followers_count"
+        )
+        self.assertEqual(list(counts), [(1, 1), (0, 1), (1, 0)])
+
+
+class FollowVerbTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user("me@test.com", "password123")
+        self.other = User.objects.create_user("other@test.com", "password123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("users:follow", args=[self.other.id])
+
+    def assertFollowing(self, following):
+        self.user.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.user.following_count, int(following))
+        self.assertEqual(self.other.followers_count, int(following))
+        self.assertEqual(Follow.objects.exists(), following)
+
+    def test_put_follows_idempotently(self):
+        for _ in range(2):
+            response = self.client.put(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["followed"], self.other.id)
+            self.assertFollowing(True)
+
+    def test_delete_unfollows_idempotently(self):
+        self.client.put(self.url)
+        for _ in range(2):
+            response = self.client.delete(self.url)
+            self.assertEqual(response.status_code, 204)
+            self.assertFollowing(False)
+
+    def test_put_missing_user(self):
+        response = self.client.put(reverse("users:follow", args=[999]))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_put_self(self):
+        response = self.client.put(reverse("users:follow", args=[self.user.id]))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFollowing(False)
+
+
+class ProfileDetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user("me@test.com", "password123")
+        self.other = User.objects.create_user("other@test.com", "password123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("users:profile_detail", args=[self.user.id])
+
+    def test_follow_invalidates_cached_profile(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        self.client.put(reverse("users:follow", args=[self.other.id]))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["following"], [self.other.id])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ProfileImageTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        # Only staff may update profiles through the detail endpoint.
+        self.user = get_user_model().objects.create_user(
+            "me@test.com", "password123", is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("users:profile_detail", args=[self.user.id])
+
+    def test_removing_image_releases_it_and_its_renditions(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (10, 10)).save(buffer, format="PNG")
+        self.client.patch(
+            self.url,
+            {"image": SimpleUploadedFile("me.png", buffer.getvalue())},
+            format="multipart",
+        )
+        self.user.refresh_from_db()
+        storage = self.user.image.storage
+        rendition = storage.save(
+            "uploads/renditions/me-full.webp", ContentFile(b"rendition")
+        )
+        self.user.image_renditions = {"full": rendition}
+        self.user.save(update_fields=["image_renditions"])
+        names = [self.user.image.name, rendition]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                self.url, {"image": None}, format="json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.image)
+        self.assertEqual(self.user.image_renditions, {})
+        self.assertFalse(MediaBlob.objects.filter(name__in=names).exists())
+        self.assertFalse(any(storage.exists(name) for name in names))
@@ -5,7 +5,9 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
+from user import async_views
 from user.views import (
+    BulkFollowAPIView,
     CreateUserView,
     FollowUnfollowAPIView,
     ProfileList,
@@ -21,6 +23,11 @@ urlpatterns = [
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
     path("me/", ManageUserView.as_view(), name="manage"),
+    path(
+        "me/following/bulk/",
+        BulkFollowAPIView.as_view(),
+        name="bulk_follow"
+    ),
     path("profiles/", ProfileList.as_view(), name="profile_list"),
     path(
         "profiles/<int:pk>/",
@@ -32,6 +39,16 @@ urlpatterns = [
         FollowUnfollowAPIView.as_view(),
         name="follow"
     ),
+    path(
+        "async/profiles/",
+        async_views.profile_list,
+        name="profile_list_async"
+    ),
+    path(
+        "async/profiles/<int:pk>/follow/",
+        async_views.follow,
+        name="follow_async"
+    ),
 ]
 
 app_name = "user"
@@ -1,19 +1,29 @@
 from django.contrib.auth import get_user_model
+from django.http import Http404
+from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.reverse import reverse_lazy
 from rest_framework.views import APIView
-from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.response import Response
 from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
 
+from social_media.caching import CachedRetrieveMixin, ConditionalListMixin
+from social_media.streaming import StreamingListMixin
+from user.authentication import (
+    CachedJWTAuthentication,
+    invalidate_cached_user,
+)
 from user.permissions import IsAdminOrOwnerOrIfAuthenticatedReadOnly, IsAdminOrIfAuthenticatedReadOnly
 from user.serializers import (
+    BulkFollowSerializer,
     UserSerializer,
     FollowUnfollowSerializer,
     ProfileDetailUpdateDeleteSerializer,
     ProfileListSerializer,
+    ProfileReadSerializer,
 )
 
 
@@ -23,11 +33,13 @@ class CreateUserView(generics.CreateAPIView):
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
+        # request.user may come from the auth cache, writes need the
+        # current row or they would overwrite counters changed since.
+        return get_user_model().objects.get(pk=self.request.user.pk)
 
 
 class LogoutView(APIView):
@@ -38,23 +50,69 @@ class LogoutView(APIView):
     permission_classes = (IsAuthenticated,)
 
     def post(self, request):
-        tokens = OutstandingToken.objects.filter(user_id=request.user.id)
-        for token in tokens:
-            t, _ = BlacklistedToken.objects.get_or_create(token=token)
+        token_ids = OutstandingToken.objects.filter(
+            user_id=request.user.id,
+            blacklistedtoken__isnull=True,
+        ).values_list("id", flat=True)
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token_id=token_id) for token_id in token_ids],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+        invalidate_cached_user(request.user.id)
 
         return Response(status=status.HTTP_205_RESET_CONTENT)
 
 
-class ProfileList(generics.ListCreateAPIView):
+class BulkFollowAPIView(APIView):
+    """
+    POST follows and DELETE unfollows up to 500 users at once.
+    """
+    serializer_class = BulkFollowSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return self.bulk_update(request, "follow")
+
+    def delete(self, request):
+        return self.bulk_update(request, "unfollow")
+
+    def bulk_update(self, request, action):
+        serializer = self.serializer_class(
+            data=request.data,
+            context={"request": request, "action": action}
+        )
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            {"results": serializer.save()},
+            status=status.HTTP_200_OK
+        )
+
+
+@extend_schema_view(get=extend_schema(responses=ProfileListSerializer))
+class ProfileList(
+    StreamingListMixin, ConditionalListMixin, generics.ListCreateAPIView
+):
     queryset = get_user_model().objects.all()
     serializer_class = ProfileListSerializer
     permission_classes = [IsAdminOrIfAuthenticatedReadOnly]
 
+    def get_serializer_class(self):
+        if self.request.method == "GET":
+            return ProfileReadSerializer
+        return ProfileListSerializer
 
-class ProfileDetailUpdateDeleteAPIView(generics.RetrieveUpdateDestroyAPIView):
+
+class ProfileDetailUpdateDeleteAPIView(
+    CachedRetrieveMixin, generics.RetrieveUpdateDestroyAPIView
+):
     queryset = get_user_model().objects.all()
     serializer_class = ProfileDetailUpdateDeleteSerializer
     permission_classes = [IsAdminOrOwnerOrIfAuthenticatedReadOnly]
+    cache_prefix = "profile"
+
+    def get_cache_pk(self):
+        return self.request.user.id
 
     def get_object(self):
         obj = get_user_model().objects.get(id=self.request.user.id)
@@ -63,6 +121,10 @@ class ProfileDetailUpdateDeleteAPIView(generics.RetrieveUpdateDestroyAPIView):
 
 
 class FollowUnfollowAPIView(APIView):
+    """
+    POST toggles following of the user, PUT follows and DELETE unfollows.
+    PUT and DELETE are idempotent and never read before writing.
+    """
     serializer_class = FollowUnfollowSerializer
     permission_classes = [IsAuthenticated]
 
@@ -74,6 +136,39 @@ class FollowUnfollowAPIView(APIView):
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        return self.follow_response(request, followed_user)
+
+    def put(self, request, pk):
+        serializer = self.get_edge_serializer(request, pk, "follow")
+        serializer.save()
+        if (
+            not serializer.changed
+            and not get_user_model().objects.filter(pk=pk).exists()
+        ):
+            raise Http404
+        return self.follow_response(request, serializer.context["followed_user"])
+
+    def delete(self, request, pk):
+        serializer = self.get_edge_serializer(request, pk, "unfollow")
+        serializer.save()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def get_edge_serializer(self, request, pk, action):
+        if pk == request.user.id:
+            raise ValidationError("You can not follow yourself.")
+        serializer = self.serializer_class(
+            data=request.data,
+            context={
+                "request": request,
+                "followed_user": get_user_model()(pk=pk),
+                "action": action,
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer
+
+    @staticmethod
+    def follow_response(request, followed_user):
         url = reverse_lazy(
             "user:profile_detail",
             kwargs={"pk": followed_user.pk},